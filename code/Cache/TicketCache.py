@@ -0,0 +1,116 @@
+"""
+@brief Caché en memoria de respuestas serializadas.
+
+@details La caché es local a cada proceso: con varios workers cada uno mantiene
+         la suya. Las entradas que pueden quedar desactualizadas por escrituras
+         de otro worker guardan la versión de la que se derivaron, y quien lee
+         la compara con la base antes de usarlas.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    @brief Caché LRU acotada con expiración por tiempo, segura entre hilos.
+
+    @details Cada entrada puede guardar la versión de la que se derivó. Si
+             get() recibe la versión actual y no coincide, la entrada se
+             descarta y cuenta como fallo; así un valor leído antes de una
+             escritura concurrente nunca se sirve, sin bloquear el guardado de
+             las demás claves.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version=None):
+        """
+        @brief Devuelve el valor guardado para la clave, o None si no está, expiró
+               o es de otra versión.
+
+        @param version Versión actual del dato; si se indica y difiere de la
+               guardada con set(), la entrada se descarta.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value, stored_version = entry
+            if expires_at <= self._clock() or (version is not None and stored_version != version):
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, version=None):
+        """
+        @brief Guarda un valor.
+
+        @param version Versión de la que se derivó el valor (ver get()).
+        """
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        """
+        @brief Elimina las claves indicadas.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        @brief Elimina todas las entradas.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        @brief Devuelve métricas de uso para ajustar el tamaño y el TTL.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0
+            }
+
+
+# Respuestas de GET /tickets/<id> indexadas por id del ticket, con versión (updated_at, change_seq)
+ticket_cache = TTLCache(
+    maxsize=int(os.environ.get('TICKETING_TICKET_CACHE_SIZE', 2048)),
+    ttl=float(os.environ.get('TICKETING_TICKET_CACHE_TTL', 30))
+)
+
+# Respuesta de GET /tickets/stats/stations (payload, etag, last_modified); sin invalidación:
+# el TTL acota cuánto puede tardar en verse un cambio
+station_stats_cache = TTLCache(
+    maxsize=1,
+    ttl=float(os.environ.get('TICKETING_STATION_STATS_TTL', 5))
+)
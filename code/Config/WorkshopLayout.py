@@ -17,4 +17,61 @@ RepairType = {
     'simple': ['recepcion', 'diagnostico', 'reparacion_simple', 'pruebas', 'terminado'],
     'complex': ['recepcion', 'diagnostico', 'reparacion_compleja', 'pruebas', 'terminado'],
     'standard': ['recepcion', 'diagnostico', 'reparacion_simple', 'pruebas', 'terminado']
-}
\ No newline at end of file
+}
+
+# Orden fijo de los tipos de reparación (índices de las tablas por lote y de la librería nativa)
+REPAIR_TYPES = tuple(RepairType)
+
+# Ajustes de pesos por tipo de reparación: (origen, destino) -> minutos
+RepairTypeWeights = {
+    'simple': {('reparacion_simple', 'pruebas'): 2},  # Más rápido en reparación simple
+    'complex': {('reparacion_compleja', 'pruebas'): 4},  # Más rápido en reparación compleja
+    'standard': {}
+}
+
+# Puestos que atienden equipos en paralelo en cada estación (None = sin límite, estaciones de espera)
+StationCapacity = {
+    'recepcion': 2,
+    'diagnostico': 2,
+    'reparacion_simple': 3,
+    'reparacion_compleja': 2,
+    'pruebas': 2,
+    'almacen': 1,
+    'espera_repuestos': None,
+    'espera': None,
+    'terminado': None
+}
+
+# Minutos de atención de un equipo en cada puesto de la estación
+StationServiceTime = {
+    'recepcion': 5,
+    'diagnostico': 5,
+    'reparacion_simple': 4,
+    'reparacion_compleja': 8,
+    'pruebas': 3,
+    'almacen': 8,
+    'espera_repuestos': 0,
+    'espera': 0,
+    'terminado': 0
+}
+
+# Versión del layout: se incrementa cada vez que se modifica el grafo en tiempo de ejecución
+_layout_version = 0
+
+
+def get_layout_version():
+    """
+    @brief Devuelve la versión actual del layout del taller.
+    """
+    return _layout_version
+
+
+def notify_layout_changed():
+    """
+    @brief Marca el layout como modificado.
+
+    @details Debe llamarse después de editar WorkshopGraph o RepairTypeWeights
+             en tiempo de ejecución para que las tablas de rutas se recalculen.
+    """
+    global _layout_version
+    _layout_version += 1
@@ -1,17 +1,84 @@
 from flask import Blueprint, request, jsonify
-from Database.database import db
+from sqlalchemy import select, insert, update
+from datetime import datetime
+from Database.database import db, IN_CHUNK_SIZE
 from Models.Ticket import Ticket
 from Models.Incident import Incident
+from Controllers.Responses import (bulk_response, MAX_BULK_ITEMS, resource_validators, collection_validators,
+                                   is_not_modified, set_validators, not_modified_response)
+from Cache.TicketCache import ticket_cache
+from Serialization.Serializer import incident_serializer, json_response
+from Database.ChangeTracking import get_version, bump_version
+from Database.Pagination import (wants_page, parse_page_request, parse_fields,
+                                 projection_columns, apply_keyset, split_page, project_rows)
 
 incidents_bp = Blueprint('incidents', __name__)
 
+ALLOWED_PRIORITIES = {'low', 'medium', 'high'}
+ALLOWED_STATUSES = {'open', 'in_progress', 'resolved', 'closed'}
+
+def _validate_incident_data(data):
+    """
+    @brief Valida los datos de creación de un incidente.
+    
+    @details No verifica que el ticket exista.
+    
+    @return Mensaje de error, o None si los datos son válidos.
+    """
+    if not data:
+        return 'No se proporcionaron datos'
+    if not isinstance(data, dict):
+        return 'Formato de incidente inválido'
+    if not data.get('description') or not str(data.get('description')).strip():
+        return 'La descripción es requerida y no puede estar vacía'
+    if not data.get('ticket_id') or not isinstance(data.get('ticket_id'), int):
+        return 'Descripción y ticket_id son requeridos'
+    if 'priority' in data and data['priority'] not in ALLOWED_PRIORITIES:
+        return f"Prioridad inválida. Valores permitidos: {list(ALLOWED_PRIORITIES)}"
+    if 'status' in data and data['status'] not in ALLOWED_STATUSES:
+        return f"Estado inválido. Valores permitidos: {list(ALLOWED_STATUSES)}"
+    return None
+
+def _touch_tickets(ticket_ids, seq):
+    """
+    @brief Actualiza updated_at y change_seq de los tickets indicados.
+    
+    @details El detalle de un ticket incluye sus incidentes, así que cambiar un
+             incidente cambia también el ETag, el Last-Modified y la secuencia
+             de cambios del ticket.
+    """
+    ticket_ids = list(ticket_ids)
+    now = datetime.utcnow()
+    for start in range(0, len(ticket_ids), IN_CHUNK_SIZE):
+        chunk = ticket_ids[start:start + IN_CHUNK_SIZE]
+        db.session.execute(
+            update(Ticket).where(Ticket.id.in_(chunk)).values(updated_at=now, change_seq=seq),
+            execution_options={'synchronize_session': False}
+        )
+
+def _incident_fields(data):
+    """
+    @brief Devuelve los valores de un incidente nuevo con sus valores por defecto.
+    """
+    return {
+        'description': data['description'].strip(),
+        'priority': data.get('priority', 'medium'),
+        'status': data.get('status', 'open'),
+        'ticket_id': data['ticket_id']
+    }
+
 @incidents_bp.route('/incidents', methods=['GET'])
 def list_incidents():
     """
     @brief Obtiene una lista de todos los incidentes.
     
     @details Puede ser filtrada por el ID de un ticket si se proporciona
-             el parámetro 'ticket_id' en la query string.
+             el parámetro 'ticket_id' en la query string. Si se indica 'limit',
+             'cursor', 'order_by' o 'fields', la lista se pagina por cursor
+             (keyset) y el cursor de la página siguiente se devuelve en la
+             cabecera X-Next-Cursor. Con 'fields' solo se leen las columnas pedidas.
+             Sin paginación, la respuesta lleva un ETag derivado de la versión
+             de la colección y admite peticiones condicionales (304).
     
     @return Una respuesta JSON con la lista de incidentes.
     ---
@@ -20,6 +87,24 @@ def list_incidents():
         name: ticket_id
         type: integer
         description: Filtrar incidentes por ticket_id
+      - in: query
+        name: limit
+        type: integer
+        description: Cantidad máxima de incidentes por página (1-1000, por defecto 100)
+      - in: query
+        name: cursor
+        type: string
+        description: Cursor opaco devuelto en X-Next-Cursor por la página anterior
+      - in: query
+        name: order_by
+        type: string
+        enum: [id, updated_at]
+        default: id
+        description: Clave de ordenamiento de la paginación
+      - in: query
+        name: fields
+        type: string
+        description: Campos a devolver separados por coma (ej. id,ticket_id,status)
     responses:
       200:
         description: Lista de incidentes
@@ -45,12 +130,50 @@ def list_incidents():
     """
     ticket_id = request.args.get('ticket_id', type=int)
     
+    if wants_page(request.args):
+        return _list_incidents_page(ticket_id)
+    
+    name = f'incidents-{ticket_id}' if ticket_id else 'incidents'
+    etag, last_modified = collection_validators(name, *get_version())
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
     if ticket_id:
         incidents = Incident.query.filter_by(ticket_id=ticket_id).all()
     else:
         incidents = Incident.query.all()
     
-    return jsonify([incident.to_dict() for incident in incidents])
+    return set_validators(json_response(incident_serializer.dumps_many(incidents)), etag, last_modified)
+
+def _list_incidents_page(ticket_id):
+    """
+    @brief Devuelve una página de incidentes según los parámetros de paginación y proyección.
+    """
+    try:
+        page = parse_page_request(request.args)
+        fields = parse_fields(Incident, request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if fields is None:
+        query = Incident.query
+    else:
+        query = db.session.query(*projection_columns(Incident, fields, page))
+    
+    if ticket_id:
+        query = query.filter(Incident.ticket_id == ticket_id)
+    
+    rows, next_cursor = split_page(apply_keyset(query, Incident, page).all(), page)
+    
+    if fields is None:
+        items = incident_serializer.many(rows)
+    else:
+        items = project_rows(rows, fields)
+    
+    response = json_response(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @incidents_bp.route('/incidents', methods=['POST'])
 def create_incident():
@@ -99,43 +222,125 @@ def create_incident():
     data = request.get_json()
     
     # --- Validación de datos de entrada ---
-    if not data:
-        return jsonify({'error': 'No se proporcionaron datos'}), 400
-    if not data.get('description') or not str(data.get('description')).strip():
-        return jsonify({'error': 'La descripción es requerida y no puede estar vacía'}), 400
-    if not data.get('ticket_id') or not isinstance(data.get('ticket_id'), int):
-        return jsonify({'error': 'Descripción y ticket_id son requeridos'}), 400
-    
-    allowed_priorities = {'low', 'medium', 'high'}
-    allowed_statuses = {'open', 'in_progress', 'resolved', 'closed'}
-    
-    if 'priority' in data and data['priority'] not in allowed_priorities:
-        return jsonify({'error': f"Prioridad inválida. Valores permitidos: {list(allowed_priorities)}"}), 400
-    if 'status' in data and data['status'] not in allowed_statuses:
-        return jsonify({'error': f"Estado inválido. Valores permitidos: {list(allowed_statuses)}"}), 400
+    error = _validate_incident_data(data)
+    if error:
+        return jsonify({'error': error}), 400
 
     # Verificar que el ticket existe
     ticket = Ticket.query.get(data['ticket_id'])
     if not ticket:
         return jsonify({'error': 'Ticket no encontrado'}), 404
     
-    incident = Incident(
-        description=data['description'].strip(),
-        priority=data.get('priority', 'medium'),
-        status=data.get('status', 'open'),
-        ticket_id=data['ticket_id']
-    )
+    incident = Incident(**_incident_fields(data))
+    ticket.updated_at = datetime.utcnow()
     
     db.session.add(incident)
+    db.session.flush()
+    Ticket.refresh_repair_types([incident.ticket_id])
     db.session.commit()
+    ticket_cache.invalidate(incident.ticket_id)
     
     return jsonify(incident.to_dict()), 201
 
+@incidents_bp.route('/incidents/bulk', methods=['POST'])
+def create_incidents_bulk():
+    """
+    @brief Crea muchos incidentes en una sola petición.
+    
+    @details Recibe un arreglo JSON de incidentes con el mismo formato que
+             POST /incidents. Valida todos los elementos antes de escribir,
+             comprueba la existencia de los tickets referenciados con consultas
+             IN (...) e inserta los válidos con una única sentencia INSERT por
+             lotes dentro de una sola transacción. Devuelve el resultado de cada
+             elemento en el mismo orden que la entrada.
+    
+    @return Una respuesta JSON con los resultados por elemento. El código es 201
+            si se crearon todos, 207 si solo algunos y 400 si ninguno.
+    ---
+    parameters:
+      - in: body
+        name: incidents
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - description
+              - ticket_id
+            properties:
+              description:
+                type: string
+              priority:
+                type: string
+                enum: [low, medium, high]
+              status:
+                type: string
+                enum: [open, in_progress, resolved, closed]
+              ticket_id:
+                type: integer
+    responses:
+      201:
+        description: Todos los incidentes fueron creados
+      207:
+        description: Algunos incidentes no pasaron la validación
+      400:
+        description: Datos inválidos
+    """
+    data = request.get_json()
+    
+    if not isinstance(data, list) or not data:
+        return jsonify({'error': 'Se esperaba un arreglo de incidentes no vacío'}), 400
+    if len(data) > MAX_BULK_ITEMS:
+        return jsonify({'error': f'Se permiten como máximo {MAX_BULK_ITEMS} incidentes por petición'}), 400
+    
+    # --- Validación completa antes de escribir ---
+    errors = [_validate_incident_data(item) for item in data]
+    
+    # Verificar la existencia de todos los tickets referenciados de una vez
+    ticket_ids = list({item['ticket_id'] for item, error in zip(data, errors) if not error})
+    existing_ids = set()
+    for start in range(0, len(ticket_ids), IN_CHUNK_SIZE):
+        chunk = ticket_ids[start:start + IN_CHUNK_SIZE]
+        existing_ids.update(db.session.execute(select(Ticket.id).where(Ticket.id.in_(chunk))).scalars())
+    
+    results = []
+    rows = []
+    for index, (item, error) in enumerate(zip(data, errors)):
+        if not error and item['ticket_id'] not in existing_ids:
+            error = 'Ticket no encontrado'
+        if error:
+            results.append({'index': index, 'status': 'error', 'error': error})
+        else:
+            results.append({'index': index, 'status': 'created'})
+            rows.append(_incident_fields(item))
+    
+    # --- Inserción por lotes en una sola transacción ---
+    if rows:
+        ids = db.session.execute(
+            insert(Incident).returning(Incident.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        # El INSERT masivo no pasa por el flush de la sesión
+        _touch_tickets({row['ticket_id'] for row in rows}, bump_version(db.session))
+        Ticket.refresh_repair_types(row['ticket_id'] for row in rows)
+        db.session.commit()
+        ticket_cache.invalidate(*{row['ticket_id'] for row in rows})
+        
+        created = iter(ids)
+        for result in results:
+            if result['status'] == 'created':
+                result['id'] = next(created)
+    
+    return bulk_response(results, len(rows))
+
 @incidents_bp.route('/incidents/<int:incident_id>', methods=['GET'])
 def get_incident(incident_id):
     """
     @brief Obtiene un incidente específico por su ID.
     
+    @details La respuesta lleva un ETag y un Last-Modified derivados del id y
+             de updated_at, y admite peticiones condicionales (304).
+    
     @param incident_id El ID del incidente a obtener.
     
     @return Una respuesta JSON con los datos del incidente o un 404 si no se encuentra.
@@ -149,11 +354,18 @@ def get_incident(incident_id):
     responses:
       200:
         description: Incidente encontrado
+      304:
+        description: El incidente no cambió desde la versión indicada por el cliente
       404:
         description: Incidente no encontrado
     """
     incident = Incident.query.get_or_404(incident_id)
-    return jsonify(incident.to_dict())
+    
+    etag, last_modified = resource_validators(incident.id, incident.updated_at)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    return set_validators(json_response(incident_serializer.dumps(incident)), etag, last_modified)
 
 @incidents_bp.route('/incidents/<int:incident_id>', methods=['PUT'])
 def update_incident(incident_id):
@@ -202,8 +414,8 @@ def update_incident(incident_id):
     # --- Lógica de actualización segura y validada ---
     allowed_updates = {
         'description': lambda v: isinstance(v, str) and v.strip(),
-        'priority': lambda v: v in {'low', 'medium', 'high'},
-        'status': lambda v: v in {'open', 'in_progress', 'resolved', 'closed'}
+        'priority': lambda v: v in ALLOWED_PRIORITIES,
+        'status': lambda v: v in ALLOWED_STATUSES
     }
     
     for key, value in data.items():
@@ -213,7 +425,12 @@ def update_incident(incident_id):
             else:
                 return jsonify({'error': f"Valor inválido para el campo '{key}'"}), 400
 
+    if db.session.is_modified(incident):
+        incident.ticket.updated_at = datetime.utcnow()
+        db.session.flush()
+        Ticket.refresh_repair_types([incident.ticket_id])
     db.session.commit()
+    ticket_cache.invalidate(incident.ticket_id)
     return jsonify(incident.to_dict())
 
 @incidents_bp.route('/incidents/<int:incident_id>', methods=['DELETE'])
@@ -238,6 +455,11 @@ def delete_incident(incident_id):
         description: Incidente no encontrado
     """
     incident = Incident.query.get_or_404(incident_id)
+    ticket_id = incident.ticket_id
+    incident.ticket.updated_at = datetime.utcnow()
     db.session.delete(incident)
+    db.session.flush()
+    Ticket.refresh_repair_types([ticket_id])
     db.session.commit()
+    ticket_cache.invalidate(ticket_id)
     return jsonify({'message': 'Incidente eliminado exitosamente'})
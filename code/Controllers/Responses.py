@@ -0,0 +1,75 @@
+from flask import jsonify, request, current_app
+from datetime import timezone
+
+# Cantidad máxima de elementos por petición en los endpoints masivos
+MAX_BULK_ITEMS = 50000
+
+def bulk_response(results, created_count):
+    """
+    @brief Arma la respuesta de un endpoint masivo a partir de los resultados por elemento.
+    
+    @param results Lista con el resultado de cada elemento, en el orden de entrada.
+    @param created_count Cantidad de elementos creados.
+    @return Tupla (respuesta JSON, código) con 201 si se crearon todos los
+            elementos, 207 si solo algunos y 400 si ninguno.
+    """
+    if created_count == len(results):
+        status = 201
+    elif created_count:
+        status = 207
+    else:
+        status = 400
+    return jsonify({
+        'created': created_count,
+        'failed': len(results) - created_count,
+        'results': results
+    }), status
+
+def resource_validators(resource_id, updated_at):
+    """
+    @brief Calcula el ETag y el Last-Modified de un recurso individual.
+    
+    @param resource_id ID del recurso.
+    @param updated_at Fecha de la última modificación (UTC sin zona horaria).
+    @return Tupla (etag, last_modified).
+    """
+    stamp = updated_at.strftime('%Y%m%d%H%M%S%f') if updated_at else '0'
+    return f'{resource_id}-{stamp}', updated_at
+
+def collection_validators(name, version, updated_at):
+    """
+    @brief Calcula el ETag y el Last-Modified de una colección a partir de su versión.
+    """
+    return f'{name}-{version}', updated_at
+
+def is_not_modified(etag, last_modified=None):
+    """
+    @brief Evalúa If-None-Match e If-Modified-Since de la petición actual.
+    
+    @details Si la petición trae If-None-Match se ignora If-Modified-Since
+             (RFC 9110, sección 13.2.2).
+    
+    @return True si el cliente ya tiene la representación actual.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        # Last-Modified tiene resolución de segundos
+        modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return modified <= request.if_modified_since
+    return False
+
+def set_validators(response, etag, last_modified=None):
+    """
+    @brief Agrega las cabeceras ETag y Last-Modified a una respuesta.
+    """
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return response
+
+def not_modified_response(etag, last_modified=None):
+    """
+    @brief Respuesta 304 sin cuerpo con los validadores del recurso.
+    """
+    return set_validators(current_app.response_class(status=304), etag, last_modified)
@@ -1,19 +1,137 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, abort
 from Database.database import db
 from Models.Ticket import Ticket
 from Models.Incident import Incident
+from Controllers.Responses import (bulk_response, MAX_BULK_ITEMS, resource_validators, collection_validators,
+                                   is_not_modified, set_validators, not_modified_response)
+from Cache.TicketCache import ticket_cache, station_stats_cache
+from Database.ChangeTracking import get_version, bump_version
+from Database.StationStats import station_stats, load_forecast
+from Routing.StationLoad import station_load
+from Models.TicketTombstone import TicketTombstone
+from Events.TicketEvents import ticket_events, format_event, location_event
+from Routing.BatchOptimizer import optimize_active_tickets, resolve_backend
+from Config.WorkshopLayout import RepairType
+from Serialization.Serializer import (ticket_serializer, incident_serializer, active_ticket_rows,
+                                      dumps, json_response)
+from Database.Pagination import (wants_page, parse_page_request, parse_fields,
+                                 projection_columns, apply_keyset, split_page, project_rows)
+from sqlalchemy import select, insert
+from sqlalchemy.orm import selectinload, joinedload, lazyload
 
 tickets_bp = Blueprint('tickets_bp', __name__)
 
+# Estrategias de carga de la relación Ticket.incidents para los listados
+INCIDENT_LOADERS = {
+    'selectin': selectinload,  # Una consulta extra con IN (...) para todos los tickets
+    'joined': joinedload,      # LEFT OUTER JOIN en la misma consulta
+    'lazy': lazyload           # Una consulta por ticket (comportamiento original)
+}
+
+def _with_incidents(query, default='selectin'):
+    """
+    @brief Aplica la estrategia de carga de incidentes a una consulta de tickets.
+    
+    @details Cada endpoint define su estrategia por defecto; el cliente puede
+             cambiarla con el parámetro 'incidents_loading' de la query string.
+    
+    @param query Consulta sobre Ticket.
+    @param default Estrategia por defecto del endpoint.
+    @return La consulta con la opción de carga, o None si la estrategia es inválida.
+    """
+    strategy = request.args.get('incidents_loading', default)
+    loader = INCIDENT_LOADERS.get(strategy)
+    if loader is None:
+        return None
+    return query.options(loader(Ticket.incidents))
+
+# Segundos sin eventos tras los cuales el stream SSE envía un comentario de keep-alive
+SSE_KEEPALIVE = 15
+
+# Modos de cálculo de GET /tickets/<id>/optimal-workflow
+ROUTING_MODES = ('static', 'load-aware')
+
+# Tamaño de lote por defecto y máximo para la exportación NDJSON
+EXPORT_BATCH_SIZE = 500
+MAX_EXPORT_BATCH_SIZE = 5000
+
+def _validate_ticket_data(data):
+    """
+    @brief Valida los datos de creación de un ticket.
+    
+    @return Mensaje de error, o None si los datos son válidos.
+    """
+    if not data:
+        return 'No se proporcionaron datos'
+    if not isinstance(data, dict):
+        return 'Formato de ticket inválido'
+    if not data.get('title') or not str(data.get('title')).strip():
+        return 'El título es requerido y no puede estar vacío'
+    if not data.get('client_name') or not str(data.get('client_name')).strip():
+        return 'Título y nombre del cliente son requeridos'
+    return None
+
+def _ticket_fields(data):
+    """
+    @brief Devuelve los valores de un ticket nuevo con los valores hardcodeados por defecto.
+    """
+    return {
+        'title': data['title'],
+        'client_name': data['client_name'],
+        'description': data.get('description', ''),
+        'telephone_operator_name': data.get('telephone_operator_name', 'Operador Hardcodeado'),
+        'technician_name': data.get('technician_name', 'Técnico Hardcodeado'),
+        'unit_equipment_name': data.get('unit_equipment_name', 'Equipo Hardcodeado'),
+        'state': data.get('state', 'open'),
+        'service_record_description': data.get('service_record_description', 'Registro de servicio hardcodeado'),
+        'message_content': data.get('message_content', 'Mensaje hardcodeado')
+    }
+
+def _invalid_loading_response():
+    return jsonify({'error': f"Estrategia de carga inválida. Valores permitidos: {list(INCIDENT_LOADERS)}"}), 400
+
 @tickets_bp.route('/tickets', methods=['GET'])
 def list_tickets():
     """
     @brief Obtiene una lista de todos los tickets.
     
-    @details Cada ticket en la lista incluye sus incidentes asociados.
+    @details Cada ticket en la lista incluye sus incidentes asociados. Si se
+             indica 'limit', 'cursor', 'order_by' o 'fields', la lista se pagina
+             por cursor (keyset) y el cursor de la página siguiente se devuelve
+             en la cabecera X-Next-Cursor. Con 'fields' solo se leen de la base
+             de datos las columnas pedidas; los incidentes se incluyen únicamente
+             si 'incidents' figura en la lista. Sin paginación, la respuesta
+             lleva un ETag y un Last-Modified derivados de la versión de la
+             colección; con If-None-Match o If-Modified-Since vigentes se
+             responde 304 sin leer los tickets.
     
     @return Una respuesta JSON con la lista de tickets.
     ---
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        description: Cantidad máxima de tickets por página (1-1000, por defecto 100)
+      - in: query
+        name: cursor
+        type: string
+        description: Cursor opaco devuelto en X-Next-Cursor por la página anterior
+      - in: query
+        name: order_by
+        type: string
+        enum: [id, updated_at]
+        default: id
+        description: Clave de ordenamiento de la paginación
+      - in: query
+        name: fields
+        type: string
+        description: Campos a devolver separados por coma (ej. id,client_name,current_location)
+      - in: query
+        name: incidents_loading
+        type: string
+        enum: [selectin, joined, lazy]
+        default: selectin
+        description: Estrategia de carga de los incidentes de cada ticket
     responses:
       200:
         description: Lista de todos los tickets con sus incidentes
@@ -41,8 +159,239 @@ def list_tickets():
                 items:
                   type: object
     """
-    tickets = Ticket.query.all()
-    return jsonify([ticket.to_dict() for ticket in tickets])
+    if wants_page(request.args):
+        return _list_tickets_page()
+    
+    query = _with_incidents(Ticket.query)
+    if query is None:
+        return _invalid_loading_response()
+    
+    etag, last_modified = collection_validators('tickets', *get_version())
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    tickets = query.all()
+    return set_validators(json_response(ticket_serializer.dumps_many(tickets)), etag, last_modified)
+
+def _list_tickets_page():
+    """
+    @brief Devuelve una página de tickets según los parámetros de paginación y proyección.
+    """
+    try:
+        page = parse_page_request(request.args)
+        fields = parse_fields(Ticket, request.args.get('fields'), relations=('incidents',))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if fields is None:
+        query = _with_incidents(Ticket.query)
+        if query is None:
+            return _invalid_loading_response()
+        
+        tickets, next_cursor = split_page(apply_keyset(query, Ticket, page).all(), page)
+        items = ticket_serializer.many(tickets)
+    else:
+        columns = [name for name in fields if name != 'incidents']
+        query = db.session.query(*projection_columns(Ticket, fields, page))
+        rows, next_cursor = split_page(apply_keyset(query, Ticket, page).all(), page)
+        items = project_rows(rows, columns)
+        
+        if 'incidents' in fields:
+            # Una sola consulta para los incidentes de toda la página
+            incidents_by_ticket = {}
+            ticket_ids = [row.id for row in rows]
+            if ticket_ids:
+                incidents = Incident.query.filter(Incident.ticket_id.in_(ticket_ids)).order_by(Incident.id).all()
+                for incident in incidents:
+                    incidents_by_ticket.setdefault(incident.ticket_id, []).append(incident_serializer.to_dict(incident))
+            for item, row in zip(items, rows):
+                item['incidents'] = incidents_by_ticket.get(row.id, [])
+    
+    response = json_response(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@tickets_bp.route('/tickets/export', methods=['GET'])
+def export_tickets():
+    """
+    @brief Exporta todos los tickets con sus incidentes en formato NDJSON.
+    
+    @details La respuesta se genera en streaming: los tickets se leen de la base
+             de datos en lotes (yield_per), se escribe una línea JSON por ticket
+             y cada lote se descarta de la sesión antes de leer el siguiente,
+             por lo que la memoria usada no depende de la cantidad de filas.
+    
+    @return Una respuesta application/x-ndjson con un ticket por línea.
+    ---
+    parameters:
+      - in: query
+        name: batch_size
+        type: integer
+        default: 500
+        description: Cantidad de tickets leídos por lote (1-5000)
+    produces:
+      - application/x-ndjson
+    responses:
+      200:
+        description: Tickets con sus incidentes, uno por línea
+      400:
+        description: Tamaño de lote inválido
+    """
+    batch_size = request.args.get('batch_size', EXPORT_BATCH_SIZE, type=int)
+    if batch_size < 1 or batch_size > MAX_EXPORT_BATCH_SIZE:
+        return jsonify({'error': f'El tamaño de lote debe estar entre 1 y {MAX_EXPORT_BATCH_SIZE}'}), 400
+    
+    def generate():
+        statement = (
+            select(Ticket)
+            .options(selectinload(Ticket.incidents))
+            .order_by(Ticket.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = db.session.execute(statement)
+        
+        for tickets in result.scalars().partitions():
+            lines = [dumps(item) for item in ticket_serializer.many(tickets)]
+            
+            # Liberar el lote (y sus incidentes) del mapa de identidad de la sesión
+            for ticket in tickets:
+                db.session.expunge(ticket)
+            
+            yield b'\n'.join(lines) + b'\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@tickets_bp.route('/tickets/changes', methods=['GET'])
+def get_ticket_changes():
+    """
+    @brief Devuelve los tickets creados, modificados o eliminados después de una secuencia.
+    
+    @details Cada escritura sobre un ticket o sus incidentes le asigna la
+             secuencia global de cambios (change_seq). El cliente guarda el
+             'last_seq' de la respuesta y lo envía como 'since' en la siguiente
+             consulta; con since=0 recibe todos los tickets. Las eliminaciones
+             se informan en 'deleted'. Un id puede aparecer en ambas listas si
+             fue reutilizado: los cambios deben aplicarse en orden de change_seq.
+    
+    @return Una respuesta JSON con los tickets cambiados y los eliminados.
+    ---
+    parameters:
+      - in: query
+        name: since
+        type: integer
+        default: 0
+        description: Última secuencia de cambios conocida por el cliente
+    responses:
+      200:
+        description: Cambios posteriores a la secuencia indicada
+        schema:
+          type: object
+          properties:
+            since:
+              type: integer
+            last_seq:
+              type: integer
+            tickets:
+              type: array
+              items:
+                type: object
+            deleted:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                  change_seq:
+                    type: integer
+                  deleted_at:
+                    type: string
+      304:
+        description: No hubo cambios desde la versión indicada por el cliente
+      400:
+        description: Secuencia inválida
+    """
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'error': 'La secuencia debe ser un número entero'}), 400
+    
+    last_seq, last_modified = get_version()
+    if since < 0 or since > last_seq:
+        return jsonify({'error': f'La secuencia debe estar entre 0 y {last_seq}; sincronice desde 0'}), 400
+    
+    etag, last_modified = collection_validators(f'changes-{since}', last_seq, last_modified)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    tickets = (
+        Ticket.query.options(selectinload(Ticket.incidents))
+        .filter(Ticket.change_seq > since, Ticket.change_seq <= last_seq)
+        .order_by(Ticket.change_seq, Ticket.id)
+        .all()
+    )
+    deleted = (
+        TicketTombstone.query
+        .filter(TicketTombstone.change_seq > since, TicketTombstone.change_seq <= last_seq)
+        .order_by(TicketTombstone.change_seq)
+        .all()
+    )
+    
+    response = json_response({
+        'since': since,
+        'last_seq': last_seq,
+        'tickets': ticket_serializer.many(tickets),
+        'deleted': [tombstone.to_dict() for tombstone in deleted]
+    })
+    return set_validators(response, etag, last_modified)
+
+@tickets_bp.route('/tickets/events', methods=['GET'])
+def stream_ticket_events():
+    """
+    @brief Canal Server-Sent Events con los cambios de ubicación de los tickets.
+    
+    @details Emite un evento 'location' cada vez que se confirma un cambio de
+             ubicación o de siguiente paso (move-to-next, update-location,
+             optimal-workflow), 'created' con los ids de los tickets dados de
+             alta (uno por petición, también en /tickets/bulk), 'deleted' al
+             eliminar un ticket y 'batch-optimized' al terminar una
+             optimización masiva. Cada evento incluye change_seq para que el
+             cliente pueda recuperar lo perdido con GET /tickets/changes. Si el
+             cliente no consume los eventos a tiempo se le envía 'dropped' y se
+             cierra la conexión.
+    
+    @return Una respuesta text/event-stream.
+    ---
+    produces:
+      - text/event-stream
+    responses:
+      200:
+        description: Stream de eventos
+      503:
+        description: Se alcanzó el máximo de conexiones simultáneas
+    """
+    subscriber = ticket_events.subscribe()
+    if subscriber is None:
+        return jsonify({'error': 'Se alcanzó el máximo de conexiones de eventos'}), 503
+    
+    def generate():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = subscriber.get(SSE_KEEPALIVE)
+                if event is not None:
+                    yield format_event(event)
+                elif subscriber.dropped:
+                    yield 'event: dropped\ndata: {}\n\n'
+                    break
+                else:
+                    yield ': keep-alive\n\n'
+        finally:
+            ticket_events.unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @tickets_bp.route('/tickets', methods=['POST'])
 def create_ticket():
@@ -106,36 +455,112 @@ def create_ticket():
     data = request.get_json()
     
     # --- Validación de datos de entrada ---
-    if not data:
-        return jsonify({'error': 'No se proporcionaron datos'}), 400
-    if not data.get('title') or not str(data.get('title')).strip():
-        return jsonify({'error': 'El título es requerido y no puede estar vacío'}), 400
-    if not data.get('client_name') or not str(data.get('client_name')).strip():
-        return jsonify({'error': 'Título y nombre del cliente son requeridos'}), 400
+    error = _validate_ticket_data(data)
+    if error:
+        return jsonify({'error': error}), 400
     
     # --- Creación del objeto Ticket con todos los datos ---
-    ticket = Ticket(
-        title=data['title'],
-        client_name=data['client_name'],
-        description=data.get('description', ''),
-        telephone_operator_name=data.get('telephone_operator_name', 'Operador Hardcodeado'),
-        technician_name=data.get('technician_name', 'Técnico Hardcodeado'),
-        unit_equipment_name=data.get('unit_equipment_name', 'Equipo Hardcodeado'),
-        state=data.get('state', 'open'),
-        service_record_description=data.get('service_record_description', 'Registro de servicio hardcodeado'),
-        message_content=data.get('message_content', 'Mensaje hardcodeado')
-    )
+    ticket = Ticket(**_ticket_fields(data))
     
     db.session.add(ticket)
     db.session.commit()
+    ticket_events.publish('created', {'ticket_ids': [ticket.id], 'change_seq': ticket.change_seq})
     
     return jsonify(ticket.to_dict()), 201
 
+@tickets_bp.route('/tickets/bulk', methods=['POST'])
+def create_tickets_bulk():
+    """
+    @brief Crea muchos tickets en una sola petición.
+    
+    @details Recibe un arreglo JSON de tickets con el mismo formato que
+             POST /tickets. Valida todos los elementos antes de escribir,
+             inserta los válidos con una única sentencia INSERT por lotes
+             dentro de una sola transacción y devuelve el resultado de cada
+             elemento en el mismo orden que la entrada.
+    
+    @return Una respuesta JSON con los resultados por elemento. El código es 201
+            si se crearon todos, 207 si solo algunos y 400 si ninguno.
+    ---
+    parameters:
+      - in: body
+        name: tickets
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - title
+              - client_name
+            properties:
+              title:
+                type: string
+              client_name:
+                type: string
+              description:
+                type: string
+    responses:
+      201:
+        description: Todos los tickets fueron creados
+      207:
+        description: Algunos tickets no pasaron la validación
+      400:
+        description: Datos inválidos
+    """
+    data = request.get_json()
+    
+    if not isinstance(data, list) or not data:
+        return jsonify({'error': 'Se esperaba un arreglo de tickets no vacío'}), 400
+    if len(data) > MAX_BULK_ITEMS:
+        return jsonify({'error': f'Se permiten como máximo {MAX_BULK_ITEMS} tickets por petición'}), 400
+    
+    # --- Validación completa antes de escribir ---
+    results = []
+    rows = []
+    for index, item in enumerate(data):
+        error = _validate_ticket_data(item)
+        if error:
+            results.append({'index': index, 'status': 'error', 'error': error})
+        else:
+            results.append({'index': index, 'status': 'created'})
+            rows.append(_ticket_fields(item))
+    
+    # --- Inserción por lotes en una sola transacción ---
+    if rows:
+        # El INSERT masivo no pasa por el flush de la sesión
+        seq = bump_version(db.session)
+        for row in rows:
+            row['change_seq'] = seq
+        ids = db.session.execute(
+            insert(Ticket).returning(Ticket.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        db.session.commit()
+        station_load.mark_stale()
+        # Un solo evento para todo el lote
+        ticket_events.publish('created', {'ticket_ids': ids, 'change_seq': seq})
+        
+        created = iter(ids)
+        for result in results:
+            if result['status'] == 'created':
+                result['id'] = next(created)
+    
+    return bulk_response(results, len(rows))
+
 @tickets_bp.route('/tickets/<int:ticket_id>', methods=['GET'])
 def get_ticket(ticket_id):
     """
     @brief Obtiene un ticket específico por su ID.
     
+    @details La respuesta serializada se guarda en una caché en memoria
+             (Cache.TicketCache) junto con el updated_at y el change_seq del
+             ticket. Antes de usarla se leen esos dos valores de la base (una
+             consulta por clave primaria, sin incidentes): si no coinciden, la
+             entrada se descarta aunque la escritura se haya hecho en otro
+             worker. El ETag y el Last-Modified se derivan del id y de
+             updated_at; con If-None-Match o If-Modified-Since vigentes se
+             responde 304 sin serializar el ticket.
+    
     @param ticket_id El ID del ticket a obtener.
     
     @return Una respuesta JSON con los datos del ticket o un 404 si no se encuentra.
@@ -149,11 +574,170 @@ def get_ticket(ticket_id):
     responses:
       200:
         description: Ticket encontrado
+      304:
+        description: El ticket no cambió desde la versión indicada por el cliente
       404:
         description: Ticket no encontrado
     """
-    ticket = Ticket.query.get_or_404(ticket_id)
-    return jsonify(ticket.to_dict())
+    # Versión actual del ticket, sin cargar los incidentes ni serializar
+    row = db.session.execute(
+        select(Ticket.updated_at, Ticket.change_seq).where(Ticket.id == ticket_id)
+    ).first()
+    if row is None:
+        abort(404)
+    
+    etag, last_modified = resource_validators(ticket_id, row.updated_at)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    # Una entrada de otra versión (escrita por otro worker) cuenta como fallo
+    payload = ticket_cache.get(ticket_id, (row.updated_at, row.change_seq))
+    if payload is None:
+        ticket = Ticket.query.get_or_404(ticket_id)
+        payload = ticket_serializer.dumps(ticket)
+        # Se guarda con la versión leída: si otra escritura la supera, la
+        # próxima lectura la descarta
+        ticket_cache.set(ticket_id, payload, (ticket.updated_at, ticket.change_seq))
+        etag, last_modified = resource_validators(ticket_id, ticket.updated_at)
+    
+    return set_validators(json_response(payload), etag, last_modified)
+
+@tickets_bp.route('/tickets/cache/stats', methods=['GET'])
+def get_ticket_cache_stats():
+    """
+    @brief Devuelve las métricas de la caché de detalle de tickets.
+    
+    @details Sirve para ajustar TICKETING_TICKET_CACHE_SIZE y
+             TICKETING_TICKET_CACHE_TTL.
+    
+    @return Una respuesta JSON con tamaño, aciertos, fallos y tasa de aciertos.
+    ---
+    responses:
+      200:
+        description: Métricas de la caché
+        schema:
+          type: object
+          properties:
+            size:
+              type: integer
+            maxsize:
+              type: integer
+            ttl:
+              type: number
+            hits:
+              type: integer
+            misses:
+              type: integer
+            evictions:
+              type: integer
+            hit_rate:
+              type: number
+    """
+    return jsonify(ticket_cache.stats())
+
+@tickets_bp.route('/tickets/stats/stations', methods=['GET'])
+def get_station_stats():
+    """
+    @brief Devuelve la ocupación y el tiempo en cola de cada estación del taller.
+    
+    @details Los datos se calculan con GROUP BY sobre current_location y
+             recommended_next_step, y la respuesta se guarda unos segundos en
+             memoria (TICKETING_STATION_STATS_TTL) para que los tableros que
+             consultan periódicamente no repitan las consultas.
+    
+    @return Una respuesta JSON con una entrada por estación.
+    ---
+    responses:
+      200:
+        description: Agregados por estación
+        schema:
+          type: object
+          properties:
+            stations:
+              type: array
+              items:
+                type: object
+                properties:
+                  station:
+                    type: string
+                  count:
+                    type: integer
+                    description: Equipos activos en la estación (0 en 'terminado')
+                  estimated_process_time:
+                    type: integer
+                    description: Suma de los tiempos estimados de esos equipos (minutos)
+                  oldest_updated_at:
+                    type: string
+                    description: Última actualización más antigua de esos equipos
+                  incoming:
+                    type: integer
+                    description: Equipos activos cuyo siguiente paso es la estación
+                  incoming_estimated_process_time:
+                    type: integer
+            total_active:
+              type: integer
+            version:
+              type: integer
+      304:
+        description: Los datos no cambiaron desde la versión indicada por el cliente
+    """
+    entry = station_stats_cache.get('stations')
+    if entry is None:
+        # La versión se lee antes que los agregados: en el peor caso el ETag
+        # es anterior a los datos y el próximo pedido los recibe otra vez
+        version, updated_at = get_version()
+        etag, last_modified = collection_validators('stations', version, updated_at)
+        stats = station_stats()
+        stats['version'] = version
+        entry = (dumps(stats), etag, last_modified)
+        station_stats_cache.set('stations', entry)
+    
+    payload, etag, last_modified = entry
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return set_validators(json_response(payload), etag, last_modified)
+
+@tickets_bp.route('/tickets/stats/load', methods=['GET'])
+def get_workshop_load():
+    """
+    @brief Devuelve la carga de cada estación y el rendimiento esperado del taller.
+    
+    @details Para los tickets activos estima cuántos minutos de trabajo tiene
+             pendiente cada estación según sus puestos (StationCapacity) y su
+             tiempo de atención (StationServiceTime). La estación más cargada
+             es el cuello de botella y determina la duración esperada hasta
+             terminar todos los equipos (makespan) y los equipos por hora.
+             live_occupancy es el contador en memoria que usa el ruteo
+             load-aware.
+    
+    @return Una respuesta JSON con la estimación y el detalle por estación.
+    ---
+    responses:
+      200:
+        description: Carga del taller
+        schema:
+          type: object
+          properties:
+            active_tickets:
+              type: integer
+            makespan:
+              type: integer
+              description: Minutos esperados hasta terminar los tickets activos
+            throughput_per_hour:
+              type: number
+              description: Equipos terminados por hora esperados
+            bottleneck:
+              type: string
+            stations:
+              type: array
+              items:
+                type: object
+            live_occupancy:
+              type: object
+    """
+    forecast = load_forecast()
+    forecast['live_occupancy'] = station_load.snapshot()
+    return jsonify(forecast)
 
 @tickets_bp.route('/tickets/<int:ticket_id>', methods=['PUT'])
 def update_ticket(ticket_id):
@@ -230,6 +814,7 @@ def update_ticket(ticket_id):
                 return jsonify({'error': f"Valor inválido para el campo '{key}'"}), 400
     
     db.session.commit()
+    ticket_cache.invalidate(ticket_id)
     return jsonify(ticket.to_dict())
 
 @tickets_bp.route('/tickets/<int:ticket_id>', methods=['DELETE'])
@@ -259,6 +844,11 @@ def delete_ticket(ticket_id):
     ticket = Ticket.query.get_or_404(ticket_id)
     db.session.delete(ticket)
     db.session.commit()
+    ticket_cache.invalidate(ticket_id)
+    change_seq = db.session.scalar(
+        select(TicketTombstone.change_seq).where(TicketTombstone.ticket_id == ticket_id)
+    )
+    ticket_events.publish('deleted', {'ticket_id': ticket_id, 'change_seq': change_seq})
     return jsonify({'message': 'Ticket eliminado exitosamente'})
 
 # === NUEVOS ENDPOINTS PARA OPTIMIZACIÓN DEL TALLER ===
@@ -271,6 +861,10 @@ def get_optimal_workflow(ticket_id):
     @details Usa el algoritmo de Dijkstra para determinar el flujo óptimo
              de reparación basado en el tipo de equipo y los incidentes.
     
+             Con mode=load-aware cada paso suma además la demora de cola de la
+             estación según su ocupación actual, y la respuesta incluye el
+             tiempo en cola y el rendimiento esperado del taller.
+    
     @param ticket_id El ID del ticket a optimizar.
     
     @return Una respuesta JSON con la ruta óptima calculada.
@@ -281,6 +875,12 @@ def get_optimal_workflow(ticket_id):
         required: true
         type: integer
         description: ID del ticket
+      - in: query
+        name: mode
+        type: string
+        enum: [static, load-aware]
+        default: static
+        description: Pesos estáticos o pesos más la demora de cola de cada estación
     responses:
       200:
         description: Ruta óptima calculada exitosamente
@@ -305,18 +905,40 @@ def get_optimal_workflow(ticket_id):
               type: string
             client:
               type: string
+            mode:
+              type: string
+            queue_time:
+              type: number
+              description: Minutos en cola incluidos en el tiempo estimado (solo load-aware)
+            expected_makespan:
+              type: integer
+              description: Minutos esperados hasta terminar los tickets activos (solo load-aware)
+            expected_throughput_per_hour:
+              type: number
+              description: Equipos terminados por hora esperados (solo load-aware)
+      400:
+        description: Modo inválido
       404:
         description: Ticket no encontrado
       500:
         description: Error en el cálculo de la ruta
     """
+    mode = request.args.get('mode', 'static')
+    if mode not in ROUTING_MODES:
+        return jsonify({'error': f"Modo inválido. Valores permitidos: {list(ROUTING_MODES)}"}), 400
+    
     try:
         ticket = Ticket.query.get_or_404(ticket_id)
-        optimal_path = ticket.calculate_optimal_workflow()
+        if mode == 'load-aware':
+            optimal_path, queue_time = ticket.calculate_load_aware_workflow(station_load.snapshot())
+        else:
+            optimal_path = ticket.calculate_optimal_workflow()
         
         db.session.commit()
+        ticket_cache.invalidate(ticket_id)
+        ticket_events.publish('location', location_event(ticket))
         
-        return jsonify({
+        response = {
             'ticket_id': ticket_id,
             'title': ticket.title,
             'current_location': ticket.current_location,
@@ -324,8 +946,16 @@ def get_optimal_workflow(ticket_id):
             'estimated_process_time': ticket.estimated_process_time,
             'full_path': optimal_path,
             'equipment': ticket.unit_equipment_name,
-            'client': ticket.client_name
-        })
+            'client': ticket.client_name,
+            'mode': mode
+        }
+        if mode == 'load-aware':
+            forecast = load_forecast()
+            response['queue_time'] = round(queue_time, 2)
+            response['expected_makespan'] = forecast['makespan']
+            response['expected_throughput_per_hour'] = forecast['throughput_per_hour']
+            response['bottleneck'] = forecast['bottleneck']
+        return jsonify(response)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -390,6 +1020,8 @@ def move_to_next_step(ticket_id):
         new_path = ticket.calculate_optimal_workflow()
         
         db.session.commit()
+        ticket_cache.invalidate(ticket_id)
+        ticket_events.publish('location', location_event(ticket))
         
         return jsonify({
             'ticket_id': ticket_id,
@@ -408,10 +1040,35 @@ def get_active_tickets():
     @brief Obtiene todos los tickets activos (no terminados).
     
     @details Filtra los tickets que no están en estado 'terminado' y
-             son útiles para el monitoreo del taller.
+             son útiles para el monitoreo del taller. Puede filtrarse por el
+             tipo de reparación guardado en cada ticket. El ETag se deriva de la
+             versión de la colección de tickets, por lo que un monitor que
+             consulta periódicamente recibe 304 mientras nada cambie.
+             
+             Con compact=1 se devuelven solo las columnas que muestra el
+             monitor, leídas con un select() de esas columnas sin cargar
+             objetos del ORM ni incidentes.
     
     @return Una respuesta JSON con la lista de tickets activos.
     ---
+    parameters:
+      - in: query
+        name: incidents_loading
+        type: string
+        enum: [selectin, joined, lazy]
+        default: selectin
+        description: Estrategia de carga de los incidentes de cada ticket
+      - in: query
+        name: repair_type
+        type: string
+        enum: [simple, complex, standard]
+        description: Filtrar por tipo de reparación
+      - in: query
+        name: compact
+        type: integer
+        enum: [0, 1]
+        default: 0
+        description: Devolver solo id, client_name, unit_equipment_name, current_location, recommended_next_step, estimated_process_time y state
     responses:
       200:
         description: Lista de tickets activos
@@ -424,16 +1081,49 @@ def get_active_tickets():
                 type: object
             count:
               type: integer
+      304:
+        description: La lista no cambió desde la versión indicada por el cliente
+      400:
+        description: Parámetros inválidos
       500:
         description: Error al obtener tickets activos
     """
     try:
-        active_tickets = Ticket.query.filter(Ticket.current_location != 'terminado').all()
+        compact = request.args.get('compact', '0') in ('1', 'true')
+        active = Ticket.current_location != 'terminado'
         
-        return jsonify({
-            'active_tickets': [ticket.to_dict() for ticket in active_tickets],
+        if compact:
+            query = active_ticket_rows.select().where(active).order_by(Ticket.id)
+        else:
+            query = _with_incidents(Ticket.query.filter(active))
+            if query is None:
+                return _invalid_loading_response()
+        
+        repair_type = request.args.get('repair_type')
+        if repair_type is not None:
+            if repair_type not in RepairType:
+                return jsonify({'error': f"Tipo de reparación inválido. Valores permitidos: {list(RepairType)}"}), 400
+            query = query.filter(Ticket.repair_type == repair_type)
+        
+        # La versión se lee antes que los tickets: si cambia en el medio, el
+        # próximo pedido condicional simplemente recibe la lista otra vez
+        name = 'active-compact' if compact else 'active'
+        if repair_type:
+            name = f'{name}-{repair_type}'
+        etag, last_modified = collection_validators(name, *get_version())
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        if compact:
+            active_tickets = active_ticket_rows.many(db.session.execute(query))
+        else:
+            active_tickets = ticket_serializer.many(query.all())
+        
+        response = json_response({
+            'active_tickets': active_tickets,
             'count': len(active_tickets)
         })
+        return set_validators(response, etag, last_modified)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -490,6 +1180,8 @@ def update_ticket_location(ticket_id):
         ticket.calculate_optimal_workflow()
         
         db.session.commit()
+        ticket_cache.invalidate(ticket_id)
+        ticket_events.publish('location', location_event(ticket))
         
         return jsonify({
             'ticket_id': ticket_id,
@@ -507,10 +1199,20 @@ def batch_optimize_workflows():
     
     @details Recalcula las rutas óptimas para todos los tickets que no
              están terminados, útil para reoptimizar después de cambios
-             en la configuración del taller.
+             en la configuración del taller. Usa el motor por lotes de
+             Routing.BatchOptimizer: lee solo las columnas necesarias, busca
+             los resultados en tablas precalculadas y escribe únicamente los
+             tickets cuyo resultado cambió. La respuesta incluye el tiempo de
+             cada fase y el backend usado en la búsqueda.
     
     @return Una respuesta JSON con el resultado de la optimización.
     ---
+    parameters:
+      - in: query
+        name: backend
+        type: string
+        enum: [numpy, native, python]
+        description: Backend de la búsqueda (por defecto numpy si está instalado, si no python)
     responses:
       200:
         description: Optimización completada
@@ -519,24 +1221,59 @@ def batch_optimize_workflows():
           properties:
             optimized_tickets:
               type: integer
+            updated_tickets:
+              type: integer
+            backend:
+              type: string
+              enum: [numpy, native, python]
+            native_routing:
+              type: object
+              description: Estado de la librería de Dijkstra, resuelto una vez al iniciar
+              properties:
+                backend:
+                  type: string
+                  enum: [native, python]
+                library:
+                  type: string
+                error:
+                  type: string
+            timings_ms:
+              type: object
+              properties:
+                read:
+                  type: number
+                classify:
+                  type: number
+                lookup:
+                  type: number
+                write:
+                  type: number
             message:
               type: string
+      400:
+        description: Backend inválido o no disponible
       500:
         description: Error en la optimización
     """
     try:
-        active_tickets = Ticket.query.filter(Ticket.current_location != 'terminado').all()
-        optimized_count = 0
-        
-        for ticket in active_tickets:
-            ticket.calculate_optimal_workflow()
-            optimized_count += 1
+        backend = resolve_backend(request.args.get('backend'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        result = optimize_active_tickets(backend=backend)
         
         db.session.commit()
-        
-        return jsonify({
-            'optimized_tickets': optimized_count,
-            'message': f'Se optimizaron {optimized_count} tickets activos'
+        ticket_cache.invalidate(*result.updated_ids)
+        ticket_events.publish('batch-optimized', {
+            'optimized_tickets': result.optimized,
+            'updated_tickets': len(result.updated_ids),
+            'change_seq': get_version()[0]
         })
+        
+        response = result.to_dict()
+        response['message'] = f'Se optimizaron {result.optimized} tickets activos'
+        return jsonify(response)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,113 @@
+"""
+@brief Secuencia global de cambios de tickets e incidentes.
+
+@details Cada flush que crea, modifica o elimina tickets o incidentes
+         incrementa el contador 'tickets' dentro de la misma transacción, de
+         modo que todos los workers ven la misma versión. El valor nuevo se
+         guarda en Ticket.change_seq de cada ticket afectado (un cambio en un
+         incidente cuenta como cambio de su ticket) y cada ticket eliminado
+         deja un TicketTombstone con esa secuencia. Los endpoints de listado lo
+         usan como versión para sus ETag y GET /tickets/changes para la
+         sincronización delta.
+
+         Las escrituras que no pasan por el flush de la sesión (INSERT/UPDATE
+         masivos) deben llamar a bump_version() antes del commit y asignar el
+         valor devuelto a change_seq.
+"""
+from datetime import datetime
+from itertools import chain
+from flask import Flask
+from sqlalchemy import event, select, update
+from Database.database import db, IN_CHUNK_SIZE
+from Models.ChangeCounter import ChangeCounter
+from Models.Ticket import Ticket
+from Models.Incident import Incident
+from Models.TicketTombstone import TicketTombstone
+
+TICKETS_COLLECTION = 'tickets'
+
+# Modelos cuyas escrituras cambian la colección de tickets
+TRACKED_MODELS = (Ticket, Incident)
+
+
+def bump_version(session, name=TICKETS_COLLECTION):
+    """
+    @brief Incrementa la versión de una colección en la transacción de la sesión.
+
+    @return La versión nueva.
+    """
+    table = ChangeCounter.__table__
+    return session.connection().execute(
+        update(table)
+        .where(table.c.name == name)
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+        .returning(table.c.version)
+    ).scalar_one()
+
+
+def get_version(name=TICKETS_COLLECTION):
+    """
+    @brief Devuelve la versión actual de una colección.
+
+    @return Tupla (versión, fecha de la última modificación).
+    """
+    row = db.session.execute(
+        select(ChangeCounter.version, ChangeCounter.updated_at).where(ChangeCounter.name == name)
+    ).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
+
+
+def _before_flush(session, flush_context, instances):
+    modified = [obj for obj in session.dirty if session.is_modified(obj)]
+    changed = [obj for obj in chain(session.new, modified) if isinstance(obj, TRACKED_MODELS)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, TRACKED_MODELS)]
+    if not changed and not deleted:
+        return
+
+    seq = bump_version(session)
+
+    tickets = {obj for obj in changed if isinstance(obj, Ticket)}
+    for ticket in tickets:
+        ticket.change_seq = seq
+
+    deleted_ids = set()
+    for ticket in deleted:
+        if isinstance(ticket, Ticket):
+            deleted_ids.add(ticket.id)
+            tombstone = TicketTombstone(ticket.id, seq)
+            tombstone.deleted_at = datetime.utcnow()
+            session.merge(tombstone)
+
+    # Tickets cuyos incidentes cambiaron sin que el ticket esté en el flush
+    ticket_ids = {obj.ticket_id for obj in chain(changed, deleted) if isinstance(obj, Incident)}
+    ticket_ids -= {ticket.id for ticket in tickets} | deleted_ids
+    ticket_ids.discard(None)
+    if ticket_ids:
+        mark_changed(session, ticket_ids, seq)
+
+
+def mark_changed(session, ticket_ids, seq):
+    """
+    @brief Asigna la secuencia de cambios a tickets modificados fuera del flush.
+    """
+    table = Ticket.__table__
+    ticket_ids = list(ticket_ids)
+    for start in range(0, len(ticket_ids), IN_CHUNK_SIZE):
+        chunk = ticket_ids[start:start + IN_CHUNK_SIZE]
+        session.connection().execute(update(table).where(table.c.id.in_(chunk)).values(change_seq=seq))
+
+
+def init_change_tracking(app: Flask):
+    """
+    @brief Crea el contador de la colección de tickets y registra el hook de flush.
+
+    @param app La instancia de la aplicación Flask (con init_db ya aplicado).
+    """
+    with app.app_context():
+        if db.session.get(ChangeCounter, TICKETS_COLLECTION) is None:
+            db.session.add(ChangeCounter(TICKETS_COLLECTION))
+            db.session.commit()
+
+    event.listen(db.session, 'before_flush', _before_flush)
@@ -0,0 +1,194 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Claves de ordenamiento soportadas por la paginación por cursor
+ORDER_KEYS = ('id', 'updated_at')
+
+# Parámetros de la query string que activan la paginación o la proyección
+PAGE_ARGS = ('limit', 'cursor', 'order_by', 'fields')
+
+
+class PageRequest:
+    """
+    @brief Parámetros de una página pedida por cursor.
+
+    @details 'after' contiene la clave del último elemento de la página
+             anterior: [id] u [updated_at, id] según el orden.
+    """
+
+    def __init__(self, limit, order_by, after=None):
+        self.limit = limit
+        self.order_by = order_by
+        self.after = after
+
+
+def encode_cursor(order_by, key):
+    """
+    @brief Codifica la posición de la página como un cursor opaco.
+    """
+    raw = json.dumps({'o': order_by, 'k': key}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    @brief Decodifica un cursor generado por encode_cursor.
+
+    @return Tupla (order_by, key).
+    @throws ValueError si el cursor no es válido.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return data['o'], data['k']
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError('Cursor inválido')
+
+
+def wants_page(args):
+    """
+    @brief Indica si la petición usa paginación o proyección de campos.
+    """
+    return any(name in args for name in PAGE_ARGS)
+
+
+def parse_page_request(args):
+    """
+    @brief Construye un PageRequest a partir de la query string.
+
+    @param args request.args de Flask.
+    @return PageRequest validado.
+    @throws ValueError si algún parámetro es inválido.
+    """
+    order_by = args.get('order_by', 'id')
+    if order_by not in ORDER_KEYS:
+        raise ValueError(f"Orden inválido. Valores permitidos: {list(ORDER_KEYS)}")
+
+    limit = args.get('limit', DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('El límite debe ser un número entero')
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"El límite debe estar entre 1 y {MAX_PAGE_SIZE}")
+
+    after = None
+    cursor = args.get('cursor')
+    if cursor:
+        cursor_order, after = decode_cursor(cursor)
+        if cursor_order != order_by or not isinstance(after, list):
+            raise ValueError('El cursor no corresponde al orden solicitado')
+        try:
+            if order_by == 'id':
+                (last_id,) = after
+                after = [int(last_id)]
+            else:
+                last_updated, last_id = after
+                after = [datetime.fromisoformat(last_updated), int(last_id)]
+        except (TypeError, ValueError):
+            raise ValueError('Cursor inválido')
+
+    return PageRequest(limit, order_by, after)
+
+
+def parse_fields(model, value, relations=()):
+    """
+    @brief Valida la lista de campos pedida en 'fields'.
+
+    @param model Modelo SQLAlchemy.
+    @param value Valor del parámetro (campos separados por coma) o None.
+    @param relations Relaciones que también pueden pedirse.
+    @return Lista de campos, o None si no se pidió proyección.
+    @throws ValueError si se pide un campo desconocido.
+    """
+    if value is None:
+        return None
+
+    columns = model.__table__.columns.keys()
+    fields = []
+    for name in value.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+
+    unknown = [name for name in fields if name not in columns and name not in relations]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {unknown}")
+    if not fields:
+        raise ValueError('Debe indicar al menos un campo')
+    return fields
+
+
+def projection_columns(model, fields, page):
+    """
+    @brief Devuelve las columnas a seleccionar para una proyección.
+
+    @details Además de los campos pedidos incluye las columnas necesarias
+             para construir el cursor de la página siguiente.
+    """
+    names = [name for name in fields if name in model.__table__.columns]
+    for key in ('id', page.order_by):
+        if key not in names:
+            names.append(key)
+    return [getattr(model, name) for name in names]
+
+
+def apply_keyset(query, model, page):
+    """
+    @brief Filtra, ordena y limita una consulta según el cursor.
+
+    @details Pide un elemento más que el límite para saber si hay otra página.
+    """
+    if page.order_by == 'id':
+        if page.after is not None:
+            query = query.filter(model.id > page.after[0])
+        query = query.order_by(model.id)
+    else:
+        if page.after is not None:
+            last_updated, last_id = page.after
+            query = query.filter(or_(
+                model.updated_at > last_updated,
+                and_(model.updated_at == last_updated, model.id > last_id)
+            ))
+        query = query.order_by(model.updated_at, model.id)
+
+    return query.limit(page.limit + 1)
+
+
+def split_page(rows, page):
+    """
+    @brief Separa la página pedida y calcula el cursor de la siguiente.
+
+    @param rows Resultado de una consulta preparada con apply_keyset.
+    @return Tupla (filas, cursor_siguiente) donde el cursor es None en la última página.
+    """
+    if len(rows) <= page.limit:
+        return rows, None
+
+    rows = rows[:page.limit]
+    last = rows[-1]
+    if page.order_by == 'id':
+        key = [last.id]
+    else:
+        key = [last.updated_at.isoformat(), last.id]
+    return rows, encode_cursor(page.order_by, key)
+
+
+def project_rows(rows, fields):
+    """
+    @brief Convierte filas de una proyección en diccionarios serializables.
+    """
+    items = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = getattr(row, name)
+            item[name] = value.isoformat() if isinstance(value, datetime) else value
+        items.append(item)
+    return items
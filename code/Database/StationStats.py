@@ -0,0 +1,158 @@
+"""
+@brief Ocupación y tiempos de cola por estación del taller, calculados en la base.
+
+@details Dos consultas GROUP BY reemplazan la descarga de todos los tickets
+         activos: una por ubicación actual (equipos en la estación) y otra por
+         siguiente paso recomendado (equipos que se dirigen a la estación).
+
+         load_forecast() estima el rendimiento del taller para el trabajo en
+         curso: cada estación necesita (visitas pendientes x tiempo de
+         atención / puestos) minutos; la más cargada es el cuello de botella y
+         fija la duración total (makespan) y los equipos terminados por hora.
+"""
+import math
+from sqlalchemy import select, func
+from Config import WorkshopLayout
+from Database.database import db
+from Models.Ticket import Ticket
+from Routing.LoadAwareRouting import queue_delay
+from Routing.RouteTable import route_table
+
+END_LOCATION = 'terminado'
+
+
+def _stations():
+    """
+    @brief Estaciones del layout en el orden de WorkshopGraph.
+    """
+    stations = list(WorkshopLayout.WorkshopGraph)
+    for edges in WorkshopLayout.WorkshopGraph.values():
+        for node in edges:
+            if node not in stations:
+                stations.append(node)
+    return stations
+
+
+def _empty_station(name):
+    return {
+        'station': name,
+        'count': 0,
+        'estimated_process_time': 0,
+        'oldest_updated_at': None,
+        'incoming': 0,
+        'incoming_estimated_process_time': 0
+    }
+
+
+def station_stats(session=None):
+    """
+    @brief Agrega los tickets por estación.
+
+    @details Por estación: cantidad de equipos activos, suma de
+             estimated_process_time y updated_at más antiguo de los que están
+             en ella, y cantidad y tiempo estimado de los equipos activos cuyo
+             siguiente paso recomendado es esa estación. Los tickets en
+             'terminado' no se cuentan. Las estaciones del layout
+             aparecen siempre (con ceros si están vacías); las ubicaciones que
+             no pertenecen al grafo se agregan al final.
+
+    @param session Sesión a usar (por defecto db.session).
+    @return Diccionario con la lista 'stations' y el total de tickets activos.
+    """
+    session = session if session is not None else db.session
+    stations = {name: _empty_station(name) for name in _stations()}
+
+    by_location = session.execute(
+        select(Ticket.current_location,
+               func.count(Ticket.id),
+               func.coalesce(func.sum(Ticket.estimated_process_time), 0),
+               func.min(Ticket.updated_at))
+        .where(Ticket.current_location != END_LOCATION)
+        .group_by(Ticket.current_location)
+    )
+    total_active = 0
+    for location, count, total_time, oldest in by_location:
+        station = stations.setdefault(location, _empty_station(location))
+        station['count'] = count
+        station['estimated_process_time'] = total_time
+        station['oldest_updated_at'] = oldest
+        total_active += count
+
+    by_next_step = session.execute(
+        select(Ticket.recommended_next_step,
+               func.count(Ticket.id),
+               func.coalesce(func.sum(Ticket.estimated_process_time), 0))
+        .where(Ticket.current_location != END_LOCATION, Ticket.recommended_next_step.is_not(None))
+        .group_by(Ticket.recommended_next_step)
+    )
+    for next_step, count, total_time in by_next_step:
+        station = stations.setdefault(next_step, _empty_station(next_step))
+        station['incoming'] = count
+        station['incoming_estimated_process_time'] = total_time
+
+    return {
+        'stations': list(stations.values()),
+        'total_active': total_active
+    }
+
+
+def load_forecast(session=None):
+    """
+    @brief Estima la duración total y el rendimiento para los tickets activos.
+
+    @details Agrupa los tickets activos por (ubicación, tipo de reparación) y
+             recorre una vez la ruta precalculada de cada grupo para contar las
+             visitas pendientes de cada estación, incluida la actual.
+
+    @param session Sesión a usar (por defecto db.session).
+    @return Diccionario con makespan (minutos), throughput_per_hour, la estación
+            cuello de botella y el detalle por estación.
+    """
+    session = session if session is not None else db.session
+    rows = session.execute(
+        select(Ticket.current_location, Ticket.repair_type, func.count(Ticket.id))
+        .where(Ticket.current_location != END_LOCATION)
+        .group_by(Ticket.current_location, Ticket.repair_type)
+    )
+
+    occupancy = {}
+    visits = {}
+    active = 0
+    longest_route = 0
+    for location, repair_type, count in rows:
+        active += count
+        occupancy[location] = occupancy.get(location, 0) + count
+        route = route_table.lookup(location, END_LOCATION, repair_type or 'standard')
+        path = route[0][:-1] if route else (location,)
+        for station in path:
+            visits[station] = visits.get(station, 0) + count
+        if route:
+            longest_route = max(longest_route, route[1])
+
+    stations = []
+    bottleneck = None
+    bottleneck_minutes = 0
+    for station, capacity in WorkshopLayout.StationCapacity.items():
+        service_time = WorkshopLayout.StationServiceTime.get(station, 0)
+        pending = visits.get(station, 0)
+        work_minutes = pending * service_time / capacity if capacity else 0
+        if work_minutes > bottleneck_minutes:
+            bottleneck, bottleneck_minutes = station, work_minutes
+        stations.append({
+            'station': station,
+            'capacity': capacity,
+            'service_time': service_time,
+            'occupancy': occupancy.get(station, 0),
+            'queue_delay': round(queue_delay(station, occupancy.get(station, 0)), 2),
+            'pending_visits': pending,
+            'work_minutes': round(work_minutes, 2)
+        })
+
+    makespan = max(bottleneck_minutes, longest_route)
+    return {
+        'active_tickets': active,
+        'makespan': math.ceil(makespan),
+        'throughput_per_hour': round(active * 60 / makespan, 2) if makespan else 0,
+        'bottleneck': bottleneck,
+        'stations': stations
+    }
@@ -1,21 +1,99 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask import Flask
+from sqlalchemy import event
+import os
+import re
 
 db = SQLAlchemy()
 
+DEFAULT_DATABASE_URI = 'sqlite:///ticketing_simplified.db'
+
+# Cantidad de ids por consulta IN (...) para no superar el límite de parámetros de SQLite
+IN_CHUNK_SIZE = 900
+
+# Perfiles de ajuste de SQLite (PRAGMA -> valor)
+SQLITE_PROFILES = {
+    'production': {
+        'journal_mode': 'WAL',        # Lectores y escritor concurrentes
+        'synchronous': 'NORMAL',      # Sin fsync en cada commit (seguro con WAL)
+        'busy_timeout': 5000,         # Esperar hasta 5 s si la base está bloqueada
+        'cache_size': -65536,         # 64 MiB de caché de páginas (negativo = KiB)
+        'mmap_size': 268435456,       # 256 MiB de lectura mapeada en memoria
+        'temp_store': 'MEMORY'        # Tablas e índices temporales en memoria
+    },
+    'default': {}                     # Valores por defecto de SQLite
+}
+
+SQLITE_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')
+
+_PRAGMA_VALUE = re.compile(r'^-?[A-Za-z0-9_]+$')
+
+
+def get_sqlite_pragmas(app: Flask):
+    """
+    @brief Resuelve los PRAGMA de SQLite a aplicar en cada conexión.
+
+    @details Parte del perfil indicado en la variable de entorno
+             TICKETING_SQLITE_PROFILE o en app.config['SQLITE_PROFILE']
+             ('production' por defecto). Sobre el perfil se aplican
+             app.config['SQLITE_PRAGMAS'] y luego las variables de entorno
+             TICKETING_SQLITE_<PRAGMA> (por ejemplo TICKETING_SQLITE_BUSY_TIMEOUT).
+
+    @param app La instancia de la aplicación Flask.
+    @return Diccionario {pragma: valor}.
+    """
+    profile = os.environ.get('TICKETING_SQLITE_PROFILE', app.config.get('SQLITE_PROFILE', 'production'))
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Perfil de SQLite desconocido: {profile}. Valores permitidos: {list(SQLITE_PROFILES)}")
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    for name in SQLITE_PRAGMAS:
+        value = os.environ.get(f'TICKETING_SQLITE_{name.upper()}')
+        if value:
+            pragmas[name] = value
+
+    for name, value in pragmas.items():
+        if name not in SQLITE_PRAGMAS or not _PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"PRAGMA de SQLite inválido: {name}={value}")
+
+    return pragmas
+
+
+def _sqlite_connect_hook(pragmas):
+    """
+    @brief Crea el listener que aplica los PRAGMA al abrir cada conexión.
+    """
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return on_connect
+
+
 def init_db(app: Flask):
     """
     @brief Inicializa la base de datos y crea las tablas.
-    
-    @details Configura la URI de la base de datos y otras opciones de SQLAlchemy,
-             asocia la instancia de la base de datos con la aplicación Flask y
-             crea todas las tablas definidas en los modelos si no existen.
-    
+
+    @details Configura la URI de la base de datos (variable de entorno
+             TICKETING_DATABASE_URI o la base SQLite por defecto) y otras
+             opciones de SQLAlchemy, asocia la instancia de la base de datos
+             con la aplicación Flask, registra el ajuste de PRAGMA de SQLite
+             para cada conexión y crea todas las tablas definidas en los
+             modelos si no existen.
+
     @param app La instancia de la aplicación Flask.
     """
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ticketing_simplified.db'
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', os.environ.get('TICKETING_DATABASE_URI', DEFAULT_DATABASE_URI))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     db.init_app(app)
-    
+
     with app.app_context():
-        db.create_all()
\ No newline at end of file
+        if db.engine.dialect.name == 'sqlite':
+            pragmas = get_sqlite_pragmas(app)
+            if pragmas:
+                event.listen(db.engine, 'connect', _sqlite_connect_hook(pragmas))
+
+        db.create_all()
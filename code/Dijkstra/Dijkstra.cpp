@@ -1,157 +1,183 @@
-#include <iostream>
 #include <vector>
-#include <map>
-#include <string>
 #include <queue>
 #include <limits>
-#include <sstream>
-#include <cmath>
+#include <cstdint>
 #include <algorithm>
-#include <cstring>
+#include <functional>
+#include <utility>
+
+#if defined(_WIN32)
+#define DIJKSTRA_API __declspec(dllexport)
+#else
+#define DIJKSTRA_API
+#endif
 
 using namespace std;
 
+// Grafo en formato CSR: las aristas del nodo i ocupan
+// targets[offsets[i]] .. targets[offsets[i + 1] - 1] con sus respectivos pesos
+struct Graph {
+    int32_t nodeCount;
+    vector<int32_t> offsets;
+    vector<int32_t> targets;
+    vector<int32_t> weights;
+
+    // Árbol de caminos mínimos hacia un destino, calculado bajo demanda
+    // para las consultas por lote
+    int32_t treeTarget = -1;
+    vector<int64_t> distanceToTarget;
+    vector<int32_t> nextToTarget;
+};
+
+// Calcula, con Dijkstra sobre el grafo invertido, la distancia de cada nodo
+// al destino y el siguiente salto del camino mínimo
+static void buildTreeToTarget(Graph* graph, int32_t target) {
+    if (graph->treeTarget == target) {
+        return;
+    }
+
+    int32_t n = graph->nodeCount;
+    vector<int32_t> reverseOffsets(n + 1, 0);
+    vector<int32_t> reverseSources(graph->targets.size());
+    vector<int32_t> reverseWeights(graph->targets.size());
+
+    for (int32_t targetId : graph->targets) {
+        ++reverseOffsets[targetId + 1];
+    }
+    for (int32_t i = 0; i < n; ++i) {
+        reverseOffsets[i + 1] += reverseOffsets[i];
+    }
+    vector<int32_t> fill(reverseOffsets.begin(), reverseOffsets.end() - 1);
+    for (int32_t u = 0; u < n; ++u) {
+        for (int32_t e = graph->offsets[u]; e < graph->offsets[u + 1]; ++e) {
+            int32_t slot = fill[graph->targets[e]]++;
+            reverseSources[slot] = u;
+            reverseWeights[slot] = graph->weights[e];
+        }
+    }
+
+    const int64_t infinity = numeric_limits<int64_t>::max();
+    vector<int64_t> distances(n, infinity);
+    vector<int32_t> next(n, -1);
+    priority_queue<pair<int64_t, int32_t>,
+                   vector<pair<int64_t, int32_t>>,
+                   greater<pair<int64_t, int32_t>>> pq;
+
+    distances[target] = 0;
+    next[target] = target;
+    pq.push({0, target});
+
+    while (!pq.empty()) {
+        int64_t currentDist = pq.top().first;
+        int32_t current = pq.top().second;
+        pq.pop();
+
+        if (currentDist > distances[current]) {
+            continue;
+        }
+
+        for (int32_t e = reverseOffsets[current]; e < reverseOffsets[current + 1]; ++e) {
+            int32_t previous = reverseSources[e];
+            int64_t newDist = currentDist + reverseWeights[e];
+
+            if (newDist < distances[previous]) {
+                distances[previous] = newDist;
+                next[previous] = current;
+                pq.push({newDist, previous});
+            }
+        }
+    }
+
+    graph->distanceToTarget.swap(distances);
+    graph->nextToTarget.swap(next);
+    graph->treeTarget = target;
+}
+
 extern "C" {
 
-    // Estructura para representar el grafo
-    struct Graph {
-        map<string, map<string, int>> adjacencyList;
-    };
+    // Copia el grafo a memoria nativa y devuelve un handle reutilizable
+    DIJKSTRA_API void* dijkstra_load_graph(int32_t nodeCount, const int32_t* offsets,
+                                           const int32_t* targets, const int32_t* weights) {
+        if (nodeCount <= 0 || offsets == nullptr) {
+            return nullptr;
+        }
+
+        int32_t edgeCount = offsets[nodeCount];
+        if (edgeCount < 0 || (edgeCount > 0 && (targets == nullptr || weights == nullptr))) {
+            return nullptr;
+        }
 
-    // Función auxiliar para convertir string a graph
-    Graph* parseGraph(const char* graphStr) {
-        // Para simplificar, usaremos un grafo predefinido
-        // En una implementación real, parsearías el string JSON
         Graph* graph = new Graph();
-        
-        // Grafo hardcodeado del taller (mismo que en Python)
-        graph->adjacencyList["recepcion"]["diagnostico"] = 5;
-        graph->adjacencyList["recepcion"]["almacen"] = 10;
-        graph->adjacencyList["recepcion"]["espera"] = 2;
-        
-        graph->adjacencyList["diagnostico"]["recepcion"] = 5;
-        graph->adjacencyList["diagnostico"]["reparacion_simple"] = 3;
-        graph->adjacencyList["diagnostico"]["reparacion_compleja"] = 7;
-        graph->adjacencyList["diagnostico"]["espera"] = 1;
-        
-        graph->adjacencyList["reparacion_simple"]["diagnostico"] = 3;
-        graph->adjacencyList["reparacion_simple"]["pruebas"] = 4;
-        graph->adjacencyList["reparacion_simple"]["almacen"] = 8;
-        
-        graph->adjacencyList["reparacion_compleja"]["diagnostico"] = 7;
-        graph->adjacencyList["reparacion_compleja"]["pruebas"] = 6;
-        graph->adjacencyList["reparacion_compleja"]["espera_repuestos"] = 15;
-        
-        graph->adjacencyList["pruebas"]["reparacion_simple"] = 4;
-        graph->adjacencyList["pruebas"]["reparacion_compleja"] = 6;
-        graph->adjacencyList["pruebas"]["terminado"] = 3;
-        graph->adjacencyList["pruebas"]["diagnostico"] = 5;
-        
-        graph->adjacencyList["almacen"]["recepcion"] = 10;
-        graph->adjacencyList["almacen"]["reparacion_simple"] = 8;
-        
-        graph->adjacencyList["espera_repuestos"]["reparacion_compleja"] = 1;
-        
-        graph->adjacencyList["espera"]["recepcion"] = 2;
-        graph->adjacencyList["espera"]["diagnostico"] = 1;
-        
+        graph->nodeCount = nodeCount;
+        graph->offsets.assign(offsets, offsets + nodeCount + 1);
+        graph->targets.assign(targets, targets + edgeCount);
+        graph->weights.assign(weights, weights + edgeCount);
+
         return graph;
     }
 
-    // Función para liberar memoria del grafo
-    void freeGraph(Graph* graph) {
-        delete graph;
+    // Libera un grafo creado con dijkstra_load_graph
+    DIJKSTRA_API void dijkstra_free_graph(void* handle) {
+        delete static_cast<Graph*>(handle);
     }
 
-    // Implementación del algoritmo de Dijkstra
-    const char* calculate_optimal_path(const char* start, const char* end, void* graphPtr) {
-        Graph* graph = static_cast<Graph*>(graphPtr);
-        
-        string startStr(start);
-        string endStr(end);
-        
-        // Verificar que los nodos existan en el grafo
-        if (graph->adjacencyList.find(startStr) == graph->adjacencyList.end() ||
-            graph->adjacencyList.find(endStr) == graph->adjacencyList.end()) {
-            return "[]";
+    // Resuelve muchos tickets en una sola llamada. Para cada ticket i toma el
+    // grafo handles[repairTypes[i]] y escribe en outNext[i] el siguiente nodo
+    // del camino mínimo desde starts[i] hasta end y en outTotal[i] el tiempo
+    // total. Si no hay camino ambos valen -1. Los buffers de salida los
+    // reserva quien llama. Devuelve la cantidad de tickets resueltos o -1 si
+    // los argumentos son inválidos. Todos los grafos deben compartir la misma
+    // numeración de nodos.
+    DIJKSTRA_API int32_t dijkstra_batch_next_steps(void* const* handles, int32_t handleCount, int32_t end,
+                                                   const int32_t* starts, const int32_t* repairTypes,
+                                                   int32_t count, int32_t* outNext, int32_t* outTotal) {
+        if (handles == nullptr || handleCount <= 0 || count < 0) {
+            return -1;
         }
-        
-        // Estructuras para Dijkstra
-        map<string, int> distances;
-        map<string, string> previous;
-        priority_queue<pair<int, string>, 
-                          vector<pair<int, string>>, 
-                          greater<pair<int, string>>> pq;
-        
-        // Inicializar distancias
-        for (const auto& node : graph->adjacencyList) {
-            distances[node.first] = numeric_limits<int>::max();
+        if (count > 0 && (starts == nullptr || repairTypes == nullptr || outNext == nullptr || outTotal == nullptr)) {
+            return -1;
         }
-        distances[startStr] = 0;
-        pq.push({0, startStr});
-        
-        // Algoritmo de Dijkstra
-        while (!pq.empty()) {
-            string current = pq.top().second;
-            int currentDist = pq.top().first;
-            pq.pop();
-            
-            if (currentDist > distances[current]) {
+
+        for (int32_t h = 0; h < handleCount; ++h) {
+            Graph* graph = static_cast<Graph*>(handles[h]);
+            if (graph == nullptr || end < 0 || end >= graph->nodeCount) {
+                return -1;
+            }
+        }
+
+        const int64_t infinity = numeric_limits<int64_t>::max();
+        vector<bool> ready(handleCount, false);
+        int32_t solved = 0;
+
+        for (int32_t i = 0; i < count; ++i) {
+            int32_t type = repairTypes[i];
+            outNext[i] = -1;
+            outTotal[i] = -1;
+
+            if (type < 0 || type >= handleCount) {
                 continue;
             }
-            
-            // Si llegamos al destino, podemos terminar
-            if (current == endStr) {
-                break;
+
+            Graph* graph = static_cast<Graph*>(handles[type]);
+            int32_t start = starts[i];
+            if (start < 0 || start >= graph->nodeCount) {
+                continue;
             }
-            
-            // Explorar vecinos
-            for (const auto& neighbor : graph->adjacencyList[current]) {
-                string nextNode = neighbor.first;
-                int weight = neighbor.second;
-                int newDist = currentDist + weight;
-                
-                if (newDist < distances[nextNode]) {
-                    distances[nextNode] = newDist;
-                    previous[nextNode] = current;
-                    pq.push({newDist, nextNode});
-                }
+
+            if (!ready[type]) {
+                buildTreeToTarget(graph, end);
+                ready[type] = true;
             }
-        }
-        
-        // Reconstruir el camino
-        vector<string> path;
-        string current = endStr;
-        
-        while (!current.empty() && previous.find(current) != previous.end()) {
-            path.push_back(current);
-            current = previous[current];
-        }
-        path.push_back(startStr);
-        
-        // Invertir el camino
-        reverse(path.begin(), path.end());
-        
-        // Convertir a JSON string
-        stringstream json;
-        json << "[";
-        for (size_t i = 0; i < path.size(); ++i) {
-            json << "\"" << path[i] << "\"";
-            if (i < path.size() - 1) {
-                json << ",";
+
+            if (graph->distanceToTarget[start] == infinity) {
+                continue;
             }
+
+            outNext[i] = graph->nextToTarget[start];
+            outTotal[i] = static_cast<int32_t>(graph->distanceToTarget[start]);
+            ++solved;
         }
-        json << "]";
-        
-        // Devolver como C string (Python se encargará de liberar la memoria)
-        char* result = new char[json.str().length() + 1];
-        strcpy(result, json.str().c_str());
-        
-        return result;
-    }
 
-    // Función wrapper que Python llamará
-    const char* calculate_optimal_path_wrapper(const char* start, const char* end, void* graphPtr) {
-        return calculate_optimal_path(start, end, graphPtr);
+        return solved;
     }
-}
\ No newline at end of file
+}
@@ -1,4 +1,5 @@
 #!/bin/bash
 echo "Compilando DLL de Dijkstra..."
-g++ -shared -o dijkstra.so -fPIC dijkstra.cpp
-echo "Compilación completada. Verifica que dijkstra.so se haya creado."
\ No newline at end of file
+cd "$(dirname "$0")"
+g++ -shared -o dijkstra.so -fPIC Dijkstra.cpp -std=c++11
+echo "Compilación completada. Verifica que dijkstra.so se haya creado."
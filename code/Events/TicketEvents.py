@@ -0,0 +1,126 @@
+"""
+@brief Distribución en memoria de eventos de tickets hacia los clientes SSE.
+
+@details Cada suscriptor tiene una cola acotada. Publicar nunca bloquea: si la
+         cola de un suscriptor está llena, el suscriptor se descarta y su
+         conexión se cierra con un evento 'dropped', tras lo cual el cliente
+         debe reconectarse y recuperar lo perdido con GET /tickets/changes.
+         El hub es local a cada proceso.
+"""
+import json
+import os
+import queue
+import threading
+from itertools import count
+
+# Eventos pendientes por suscriptor antes de considerarlo lento
+SUBSCRIBER_QUEUE_SIZE = 256
+# Cantidad máxima de conexiones SSE simultáneas por proceso
+MAX_SUBSCRIBERS = int(os.environ.get('TICKETING_SSE_MAX_SUBSCRIBERS', 100))
+
+
+class Subscriber:
+    """
+    @brief Cola de eventos de una conexión SSE.
+    """
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.dropped = False
+
+    def get(self, timeout):
+        """
+        @brief Espera el próximo evento.
+
+        @return El evento, o None si se agotó el tiempo o el suscriptor fue descartado.
+        """
+        if self.dropped:
+            return None
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    """
+    @brief Reparte cada evento publicado a todos los suscriptores activos.
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE, max_subscribers=MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        """
+        @brief Registra un suscriptor nuevo.
+
+        @return El suscriptor, o None si se alcanzó el máximo de conexiones.
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(self.queue_size)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event_type, data):
+        """
+        @brief Publica un evento sin bloquear.
+
+        @details Se debe llamar después del commit para no anunciar cambios que
+                 luego se revierten.
+        """
+        with self._lock:
+            event = (next(self._ids), event_type, json.dumps(data, ensure_ascii=False))
+            self.published += 1
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.queue.put_nowait(event)
+                except queue.Full:
+                    subscriber.dropped = True
+                    self._subscribers.discard(subscriber)
+                    self.dropped += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'max_subscribers': self.max_subscribers,
+                'published': self.published,
+                'dropped_subscribers': self.dropped
+            }
+
+
+def format_event(event):
+    """
+    @brief Codifica un evento en el formato text/event-stream.
+    """
+    event_id, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+def location_event(ticket):
+    """
+    @brief Datos del evento 'location' de un ticket.
+    """
+    return {
+        'ticket_id': ticket.id,
+        'current_location': ticket.current_location,
+        'recommended_next_step': ticket.recommended_next_step,
+        'estimated_process_time': ticket.estimated_process_time,
+        'change_seq': ticket.change_seq
+    }
+
+
+# Altas, bajas y cambios de ubicación y siguiente paso de los tickets
+ticket_events = EventHub()
@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from Database.database import db
+from Database.ChangeTracking import bump_version
+from sqlalchemy import text
+
+def add_change_sequence():
+    """Agrega la columna change_seq a tickets, su índice y asigna una secuencia a los tickets existentes"""
+    
+    with app.app_context():
+        try:
+            print("🔄 Iniciando migración de secuencia de cambios...")
+            
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('tickets')]
+            
+            if 'change_seq' not in columns:
+                print("Agregando columna 'change_seq'...")
+                db.session.execute(text("ALTER TABLE tickets ADD COLUMN change_seq INTEGER DEFAULT 0"))
+            
+            db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_tickets_change_seq ON tickets (change_seq)"))
+            
+            # Los tickets sin secuencia se informan en la primera sincronización (since=0)
+            pending = db.session.execute(
+                text("SELECT COUNT(*) FROM tickets WHERE change_seq IS NULL OR change_seq = 0")
+            ).scalar()
+            if pending:
+                print(f"Asignando secuencia a {pending} tickets...")
+                seq = bump_version(db.session)
+                db.session.execute(
+                    text("UPDATE tickets SET change_seq = :seq WHERE change_seq IS NULL OR change_seq = 0"),
+                    {'seq': seq}
+                )
+            
+            db.session.commit()
+            print("✅ Migración de secuencia de cambios completada exitosamente")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error en migración de secuencia de cambios: {e}")
+
+if __name__ == "__main__":
+    add_change_sequence()
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from Database.database import db
+from sqlalchemy import text
+
+# Índices declarados en Models/Ticket.py y Models/Incident.py
+INDEXES = {
+    'ix_tickets_current_location': "CREATE INDEX IF NOT EXISTS ix_tickets_current_location ON tickets (current_location)",
+    'ix_tickets_state': "CREATE INDEX IF NOT EXISTS ix_tickets_state ON tickets (state)",
+    'ix_tickets_updated_at': "CREATE INDEX IF NOT EXISTS ix_tickets_updated_at ON tickets (updated_at)",
+    'ix_tickets_active_location': (
+        "CREATE INDEX IF NOT EXISTS ix_tickets_active_location ON tickets (current_location) "
+        "WHERE current_location != 'terminado'"
+    ),
+    'ix_incidents_ticket_id': "CREATE INDEX IF NOT EXISTS ix_incidents_ticket_id ON incidents (ticket_id)",
+}
+
+def add_indexes():
+    """Crea los índices de tickets e incidentes en bases de datos existentes (idempotente)"""
+    
+    with app.app_context():
+        try:
+            print("🔄 Iniciando migración de índices...")
+            
+            inspector = db.inspect(db.engine)
+            existing = {index['name'] for table in ('tickets', 'incidents') for index in inspector.get_indexes(table)}
+            
+            for name, statement in INDEXES.items():
+                if name in existing:
+                    print(f"Índice '{name}' ya existe")
+                    continue
+                print(f"Creando índice '{name}'...")
+                db.session.execute(text(statement))
+            
+            db.session.commit()
+            
+            # Actualizar estadísticas para que el planificador use los índices nuevos
+            db.session.execute(text("ANALYZE"))
+            db.session.commit()
+            print("✅ Migración de índices completada exitosamente")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error en migración de índices: {e}")
+
+if __name__ == "__main__":
+    add_indexes()
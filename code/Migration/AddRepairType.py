@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from Database.database import db
+from Models.Ticket import Ticket
+from sqlalchemy import select, text
+
+# Tickets recalculados por transacción
+BACKFILL_BATCH_SIZE = 5000
+
+def add_repair_type():
+    """Agrega la columna repair_type a tickets, su índice y la calcula a partir de los incidentes existentes"""
+    
+    with app.app_context():
+        try:
+            print("🔄 Iniciando migración de tipo de reparación...")
+            
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('tickets')]
+            
+            if 'repair_type' not in columns:
+                print("Agregando columna 'repair_type'...")
+                db.session.execute(text("ALTER TABLE tickets ADD COLUMN repair_type VARCHAR(20) DEFAULT 'standard'"))
+            
+            db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_tickets_repair_type ON tickets (repair_type)"))
+            db.session.commit()
+            
+            # Back-fill por lotes de ids
+            ticket_ids = db.session.execute(select(Ticket.id).order_by(Ticket.id)).scalars().all()
+            updated = 0
+            for start in range(0, len(ticket_ids), BACKFILL_BATCH_SIZE):
+                updated += Ticket.refresh_repair_types(ticket_ids[start:start + BACKFILL_BATCH_SIZE])
+                db.session.commit()
+            
+            print(f"Tickets clasificados: {len(ticket_ids)} (modificados: {updated})")
+            print("✅ Migración de tipo de reparación completada exitosamente")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error en migración de tipo de reparación: {e}")
+
+if __name__ == "__main__":
+    add_repair_type()
@@ -0,0 +1,40 @@
+import sys
+import os
+import sqlite3
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Repositories.TicketRepository import DB_PATH, LEGACY_COLUMNS, WRITABLE_COLUMNS
+
+def align_ticket_repository(db_path=DB_PATH):
+    """Alinea la tabla tickets de Ticketing.db con TicketRepository: renombra las columnas antiguas y agrega las que falten"""
+
+    print("🔄 Iniciando migración del esquema de Ticketing.db...")
+    conn = sqlite3.connect(str(db_path))
+    try:
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(tickets)")}
+        if not existing:
+            print("La tabla tickets no existe; TicketRepository la crea con el esquema actual")
+            return
+
+        for old, new in LEGACY_COLUMNS.items():
+            if old in existing and new not in existing:
+                print(f"Renombrando columna '{old}' a '{new}'...")
+                conn.execute(f"ALTER TABLE tickets RENAME COLUMN {old} TO {new}")
+                existing.add(new)
+
+        for column in WRITABLE_COLUMNS:
+            if column not in existing:
+                print(f"Agregando columna '{column}'...")
+                conn.execute(f"ALTER TABLE tickets ADD COLUMN {column} TEXT")
+
+        conn.commit()
+        print("✅ Migración del esquema de Ticketing.db completada exitosamente")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error en migración del esquema de Ticketing.db: {e}")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    align_ticket_repository(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
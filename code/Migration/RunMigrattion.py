@@ -5,8 +5,16 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from AddOptimalFields import add_optimization_fields
+from AddIndexes import add_indexes
+from AddChangeSequence import add_change_sequence
+from AddRepairType import add_repair_type
+from AlignTicketRepository import align_ticket_repository
 
 if __name__ == "__main__":
     print("Ejecutando migración de base de datos...")
     add_optimization_fields()
+    add_indexes()
+    add_change_sequence()
+    add_repair_type()
+    align_ticket_repository()
     print("Migración completada!")
\ No newline at end of file
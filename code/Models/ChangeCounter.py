@@ -0,0 +1,31 @@
+from Database.database import db
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped, mapped_column
+
+class ChangeCounter(db.Model):
+    """
+    @brief Contador de versión de una colección.
+
+    @details Se incrementa en cada flush que modifica la colección (ver
+             Database/ChangeTracking.py). Los endpoints de listado lo usan
+             para armar su ETag y su Last-Modified sin leer las filas.
+    """
+    __tablename__ = 'change_counters'
+
+    name: Mapped[str] = mapped_column(db.String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(db.Integer, nullable=False, default=0)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, name, version=0):
+        """
+        @brief Constructor para la clase ChangeCounter.
+
+        @param name Nombre de la colección.
+        @param version Versión inicial.
+        """
+        self.name = name
+        self.version = version
+
+    def __repr__(self):
+        return f'<ChangeCounter {self.name}: {self.version}>'
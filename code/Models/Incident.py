@@ -19,7 +19,7 @@ class Incident(db.Model):
     updated_at: Mapped[datetime] = mapped_column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Clave foránea hacia Ticket (relación N:1)
-    ticket_id: Mapped[int] = mapped_column(db.Integer, db.ForeignKey('tickets.id'), nullable=False)
+    ticket_id: Mapped[int] = mapped_column(db.Integer, db.ForeignKey('tickets.id'), nullable=False, index=True)
     
     def __init__(self, description, ticket_id, priority='medium', status='open'):
         """
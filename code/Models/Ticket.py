@@ -1,14 +1,40 @@
-from Database.database import db
+from Database.database import db, IN_CHUNK_SIZE
 from datetime import datetime
-from typing import List, TYPE_CHECKING, Optional
+import math
+from typing import List, Optional
+from sqlalchemy import select, update
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-import ctypes
-import json
-import os
+from array import array
+from itertools import groupby
+from Models.Incident import Incident
+from Routing.RouteTable import route_table
+from Routing import NativeRouting, PythonDijkstra, LoadAwareRouting
 
 
-if TYPE_CHECKING:
-    from .Incident import Incident
+def classify_repair_type(priorities, descriptions):
+    """
+    @brief Clasifica una reparación a partir de los incidentes de un ticket.
+    
+    @param priorities Prioridades de los incidentes.
+    @param descriptions Descripciones de los incidentes.
+    @return String con el tipo de reparación ('simple', 'complex', 'standard')
+    """
+    if not priorities and not descriptions:
+        return 'standard'
+    
+    descriptions = ' '.join([description.lower() for description in descriptions])
+    
+    # Lógica para determinar complejidad
+    if any(priority == 'high' for priority in priorities):
+        return 'complex'
+    elif 'complej' in descriptions or 'difícil' in descriptions or 'grave' in descriptions:
+        return 'complex'
+    elif any(priority == 'low' for priority in priorities):
+        return 'simple'
+    elif 'simple' in descriptions or 'sencill' in descriptions or 'leve' in descriptions:
+        return 'simple'
+    else:
+        return 'standard'
 
 class Ticket(db.Model):
     """
@@ -18,6 +44,11 @@ class Ticket(db.Model):
              Para fines educativos, muchos de sus campos son hardcodeados.
     """
     __tablename__ = 'tickets'
+    __table_args__ = (
+        # Índice parcial: solo los tickets activos (consultas de monitoreo y optimización)
+        db.Index('ix_tickets_active_location', 'current_location',
+                 sqlite_where=db.text("current_location != 'terminado'")),
+    )
     
     id: Mapped[int] = mapped_column(db.Integer, primary_key=True)
     title: Mapped[str] = mapped_column(db.String(200), nullable=False)
@@ -28,21 +59,27 @@ class Ticket(db.Model):
     telephone_operator_name: Mapped[Optional[str]] = mapped_column(db.String(100), default='Operador Hardcodeado')  # TelephoneOperator hardcodeado
     technician_name: Mapped[Optional[str]] = mapped_column(db.String(100), default='Técnico Hardcodeado')  # Technician hardcodeado
     unit_equipment_name: Mapped[Optional[str]] = mapped_column(db.String(100), default='Equipo Hardcodeado')  # UnitEquipment hardcodeado
-    state: Mapped[Optional[str]] = mapped_column(db.String(50), default='open')  # State hardcodeado
+    state: Mapped[Optional[str]] = mapped_column(db.String(50), default='open', index=True)  # State hardcodeado
     service_record_description: Mapped[Optional[str]] = mapped_column(db.Text, default='Registro de servicio hardcodeado', nullable=True)  # ServiceRecord hardcodeado
     message_content: Mapped[Optional[str]] = mapped_column(db.Text, default='Mensaje hardcodeado', nullable=True)  # Message hardcodeado
     
     created_at: Mapped[datetime] = mapped_column(db.DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relación 1:N con Incident
     incidents: Mapped[List["Incident"]] = relationship(backref='ticket', lazy=True, cascade='all, delete-orphan')
 
     #Optimizacio Interna
-    current_location = db.Column(db.String(50), default='recepcion')  # Ubicación actual del equipo
+    current_location = db.Column(db.String(50), default='recepcion', index=True)  # Ubicación actual del equipo
     recommended_next_step = db.Column(db.String(50))  # Siguiente paso recomendado
     estimated_process_time = db.Column(db.Integer)  # Tiempo estimado en minutos
 
+    # Sincronización delta: secuencia global del último cambio del ticket o de sus incidentes
+    change_seq = db.Column(db.Integer, default=0, index=True)
+
+    # Tipo de reparación derivado de los incidentes (ver refresh_repair_types)
+    repair_type = db.Column(db.String(20), default='standard', index=True)
+
     def __init__(self, title, client_name, description=None, 
                  telephone_operator_name=None, technician_name=None, 
                  unit_equipment_name=None, state=None, 
@@ -89,6 +126,8 @@ class Ticket(db.Model):
             'current_location': self.current_location,
             'recommended_next_step': self.recommended_next_step,
             'estimated_process_time': self.estimated_process_time,
+            'repair_type': self.repair_type,
+            'change_seq': self.change_seq,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'incidents': [incident.to_dict() for incident in self.incidents]
@@ -101,175 +140,177 @@ class Ticket(db.Model):
         """
         @brief Calcula la ruta óptima para el proceso de reparación.
         
-        @details Usa el algoritmo de Dijkstra para determinar el flujo más eficiente
-                 a través del taller basado en el tipo de reparación necesaria.
+        @details Consulta la tabla de rutas precalculada para el tipo de reparación
+                 necesaria. Si la ubicación actual no pertenece al grafo del taller
+                 (o no tiene camino a 'terminado'), usa la ruta por defecto de
+                 _calculate_optimal_path_python.
         
         @return Lista con la ruta óptima de ubicaciones.
         """
         # Determinar tipo de reparación basado en incidentes
         repair_type = self._determine_repair_type()
         
-        # Usar DLL de Dijkstra para calcular ruta óptima
-        optimal_path = self._calculate_optimal_path_dll(self.current_location, 'terminado', repair_type)
+        # Buscar la ruta en la tabla precalculada
+        route = route_table.lookup(self.current_location, 'terminado', repair_type)
+        
+        if route is not None:
+            optimal_path = list(route[0])
+            total_time = route[1]
+        else:
+            # Ubicación sin ruta en la tabla: ningún Dijkstra la encuentra, ruta por defecto
+            optimal_path = self._calculate_optimal_path_python(self.current_location, 'terminado', repair_type)
+            total_time = self._calculate_total_time(optimal_path, repair_type)
         
         # Actualizar campos del ticket
         self.recommended_next_step = optimal_path[1] if len(optimal_path) > 1 else 'terminado'
-        self.estimated_process_time = self._calculate_total_time(optimal_path, repair_type)
+        self.estimated_process_time = total_time
         
         return optimal_path
     
+    def calculate_load_aware_workflow(self, occupancy):
+        """
+        @brief Calcula la ruta sumando a cada paso la demora de cola de la estación.
+        
+        @details Usa las mismas aristas que calculate_optimal_workflow más la
+                 demora estimada para la ocupación dada (ver
+                 Routing.LoadAwareRouting). El tiempo estimado guardado incluye
+                 traslados y colas. Si no hay camino, usa el cálculo estático.
+        
+        @param occupancy Diccionario {estación: equipos} (ver Routing.StationLoad).
+        @return Tupla (ruta, minutos_en_cola).
+        """
+        repair_type = self._determine_repair_type()
+        delays = LoadAwareRouting.queue_delays(occupancy)
+        route = LoadAwareRouting.shortest_path(self.current_location, repair_type, delays)
+        
+        if route is None:
+            return self.calculate_optimal_workflow(), 0
+        
+        path, travel_time, queue_time = route
+        self.recommended_next_step = path[1] if len(path) > 1 else 'terminado'
+        self.estimated_process_time = math.ceil(travel_time + queue_time)
+        
+        return path, queue_time
+    
+    @staticmethod
+    def batch_calculate_next_steps(locations, repair_types, end='terminado'):
+        """
+        @brief Calcula el siguiente paso y el tiempo total de muchos tickets en una sola llamada nativa.
+        
+        @details Recibe las columnas de los tickets (ubicación actual y tipo de
+                 reparación de cada uno), arma los buffers int32 y los resuelve
+                 todos con NativeRouting.batch_next_steps, sin hidratar objetos
+                 del ORM. Las posiciones sin ruta (ubicación fuera del grafo)
+                 quedan en None.
+        
+        @param locations Ubicación actual de cada ticket.
+        @param repair_types Tipo de reparación de cada ticket (None = 'standard').
+        @param end Ubicación de destino.
+        @return Tupla (siguientes_pasos, tiempos_totales), o None si la librería
+                nativa no está disponible.
+        """
+        node_ids = NativeRouting.get_node_ids()
+        if node_ids is None:
+            return None
+        
+        default_type = NativeRouting.REPAIR_TYPE_IDS['standard']
+        start_ids = array('i', [node_ids.get(location, -1) for location in locations])
+        repair_type_ids = array('i', [
+            NativeRouting.REPAIR_TYPE_IDS.get(repair_type, default_type) for repair_type in repair_types
+        ])
+        out_next = array('i', bytes(4 * len(start_ids)))
+        out_total = array('i', bytes(4 * len(start_ids)))
+        
+        if NativeRouting.batch_next_steps(start_ids, repair_type_ids, end, out_next, out_total) is None:
+            return None
+        
+        nodes = list(node_ids)
+        next_steps = [nodes[next_id] if next_id >= 0 else None for next_id in out_next]
+        totals = [total if next_id >= 0 else None for next_id, total in zip(out_next, out_total)]
+        return next_steps, totals
+    
     def _determine_repair_type(self):
         """
-        @brief Determina el tipo de reparación basado en los incidentes.
+        @brief Devuelve el tipo de reparación del ticket.
         
-        @details Analiza las prioridades y descripciones de los incidentes
-                 para clasificar la reparación como simple, compleja o estándar.
+        @details Lee la columna repair_type, que se mantiene al crear, modificar
+                 o eliminar incidentes (ver refresh_repair_types), sin recorrer
+                 los incidentes.
         
         @return String con el tipo de reparación ('simple', 'complex', 'standard')
         """
-        if not self.incidents:
-            return 'standard'
-        
-        priorities = [incident.priority for incident in self.incidents]
-        descriptions = ' '.join([incident.description.lower() for incident in self.incidents])
-        
-        # Lógica para determinar complejidad
-        if any(priority == 'high' for priority in priorities):
-            return 'complex'
-        elif 'complej' in descriptions or 'difícil' in descriptions or 'grave' in descriptions:
-            return 'complex'
-        elif any(priority == 'low' for priority in priorities):
-            return 'simple'
-        elif 'simple' in descriptions or 'sencill' in descriptions or 'leve' in descriptions:
-            return 'simple'
-        else:
-            return 'standard'
+        return self.repair_type or 'standard'
     
-    def _get_taller_graph(self):
+    @staticmethod
+    def refresh_repair_types(ticket_ids):
         """
-        @brief Define la estructura del taller como grafo para Dijkstra.
+        @brief Recalcula y guarda el tipo de reparación de los tickets indicados.
+        
+        @details Lee prioridades y descripciones de los incidentes con una
+                 consulta por lote y actualiza solo los tickets cuyo tipo cambió.
+                 Debe llamarse después de escribir los incidentes (con flush) y
+                 antes del commit.
+        
+        @param ticket_ids IDs de los tickets cuyos incidentes cambiaron.
+        @return Cantidad de tickets actualizados.
         """
-        from Config.WorkshopLayout import WorkshopGraph  # Importar del archivo de configuración
-        return WorkshopGraph
+        ticket_ids = list(set(ticket_ids))
+        updated = 0
+        
+        for start in range(0, len(ticket_ids), IN_CHUNK_SIZE):
+            chunk = ticket_ids[start:start + IN_CHUNK_SIZE]
+            incidents = db.session.execute(
+                select(Incident.ticket_id, Incident.priority, Incident.description)
+                .where(Incident.ticket_id.in_(chunk))
+                .order_by(Incident.ticket_id)
+            )
+            repair_types = {}
+            for ticket_id, rows in groupby(incidents, key=lambda row: row[0]):
+                rows = list(rows)
+                repair_types[ticket_id] = classify_repair_type([row[1] for row in rows], [row[2] for row in rows])
+            
+            changes = [
+                {'id': ticket_id, 'repair_type': repair_types.get(ticket_id, 'standard')}
+                for ticket_id, current in db.session.execute(
+                    select(Ticket.id, Ticket.repair_type).where(Ticket.id.in_(chunk))
+                )
+                if current != repair_types.get(ticket_id, 'standard')
+            ]
+            if changes:
+                db.session.execute(update(Ticket), changes)
+                updated += len(changes)
+        
+        return updated
     
     def _calculate_optimal_path_python(self, start, end, repair_type):
         """
         @brief Implementación de respaldo de Dijkstra en Python.
+        
+        @details Usa heapq sobre la vista inmutable del grafo para el tipo de
+                 reparación (ver Routing.PythonDijkstra).
         """
         graph = self._adapt_graph_for_repair_type(repair_type)
-        
-        # Implementación simple de Dijkstra
-        distances = {node: float('inf') for node in graph}
-        previous = {node: None for node in graph}
-        distances[start] = 0
-        
-        nodes = set(graph.keys())
-        
-        while nodes:
-            current = min(nodes, key=lambda node: distances[node])
-            nodes.remove(current)
-            
-            if distances[current] == float('inf'):
-                break
-                
-            for neighbor, weight in graph.get(current, {}).items():
-                new_distance = distances[current] + weight
-                if new_distance < distances[neighbor]:
-                    distances[neighbor] = new_distance
-                    previous[neighbor] = current
-        
-        # Reconstruir el camino
-        path = []
-        current = end
-        while current is not None:
-            path.append(current)
-            current = previous[current]
-        
-        path.reverse()
+        route = PythonDijkstra.shortest_path(graph, start, end)
         
         # Si no hay camino válido, devolver camino por defecto
-        if not path or path[0] != start:
-            path = [start, 'diagnostico', 'pruebas', 'terminado']  # Asegurar nombres en español
+        if route is None:
+            return [start, 'diagnostico', 'pruebas', 'terminado']
         
-        print(f"🔄 Python Dijkstra devolvió: {path}")
-        return path
+        return route[0]
     
     def _adapt_graph_for_repair_type(self, repair_type):
         """
         @brief Adapta el grafo del taller según el tipo de reparación.
         
-        @details Modifica los pesos de las aristas para priorizar ciertas rutas
-                según la complejidad de la reparación.
+        @details Devuelve una vista de solo lectura del grafo con los pesos de las
+                aristas ajustados para priorizar ciertas rutas según la
+                complejidad de la reparación. El grafo global no se modifica y
+                la vista puede compartirse entre hilos.
         
         @param repair_type Tipo de reparación ('simple', 'complex', 'standard')
         @return Grafo adaptado para el tipo de reparación
         """
-        graph = self._get_taller_graph()
-        
-        if repair_type == 'simple':
-            # Priorizar ruta simple: reducir tiempos en reparación simple
-            if 'reparacion_simple' in graph and 'pruebas' in graph['reparacion_simple']:
-                graph['reparacion_simple']['pruebas'] = 2  # Más rápido
-        elif repair_type == 'complex':
-            # Priorizar ruta compleja: reducir tiempos en reparación compleja
-            if 'reparacion_compleja' in graph and 'pruebas' in graph['reparacion_compleja']:
-                graph['reparacion_compleja']['pruebas'] = 4  # Más rápido
-        
-        return graph
-    
-    def _calculate_optimal_path_dll(self, start, end, repair_type):
-        """Usa la DLL de Dijkstra para calcular ruta óptima"""
-        try:
-            # Ruta correcta a la DLL
-            dll_path = os.path.join(os.path.dirname(__file__), '..', 'Dijkstra', 'dijkstra.dll')
-            dll_path = os.path.abspath(dll_path)
-            
-            print(f"🔍 Buscando DLL en: {dll_path}")
-            
-            # Verificar si el archivo existe
-            if not os.path.exists(dll_path):
-                raise FileNotFoundError(f"No se encuentra la DLL en: {dll_path}")
-            
-            # Cargar DLL con ruta absoluta
-            dijkstra = ctypes.CDLL(dll_path)
-            
-            # Configurar función (versión simplificada)
-            dijkstra.calculate_optimal_path.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
-            dijkstra.calculate_optimal_path.restype = ctypes.c_char_p
-            
-            # Llamar función
-            start_bytes = start.encode('utf-8')
-            end_bytes = end.encode('utf-8')
-            
-            result_ptr = dijkstra.calculate_optimal_path(start_bytes, end_bytes)
-            
-            if result_ptr:
-                result_str = ctypes.string_at(result_ptr).decode('utf-8')
-                # Liberar memoria si la DLL tiene esa función
-                if hasattr(dijkstra, 'free_result'):
-                    dijkstra.free_result(result_ptr)
-                return json.loads(result_str)
-            else:
-                raise Exception("La DLL no devolvió resultado")
-                
-        except (OSError, AttributeError, FileNotFoundError, Exception) as e:
-            print(f"❌ Error al usar DLL de Dijkstra: {e}")
-            print("🔄 Usando implementación de respaldo en Python...")
-            return self._calculate_optimal_path_python(start, end, repair_type)
-        
-    def _convert_graph_to_c_format(self, graph):
-        """
-        @brief Convierte el grafo de Python a formato compatible con C++.
-        
-        @details Esta función necesita ser adaptada según la implementación
-                 específica de tu DLL de Dijkstra.
-        
-        @param graph Grafo en formato de diccionario de Python
-        @return Puntero a estructura de datos compatible con C++
-        """
-        # Esta implementación depende de cómo esté diseñada tu DLL
-        # Por ahora, devolvemos None y manejamos el error en la función principal
-        return None
+        return PythonDijkstra.get_weight_view(repair_type)
     
     def _calculate_total_time(self, path, repair_type):
         """
@@ -0,0 +1,36 @@
+from Database.database import db
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+
+class TicketTombstone(db.Model):
+    """
+    @brief Registro de un ticket eliminado.
+
+    @details Permite que GET /tickets/changes informe las eliminaciones a los
+             clientes que sincronizan por secuencia de cambios.
+    """
+    __tablename__ = 'ticket_tombstones'
+
+    ticket_id: Mapped[int] = mapped_column(db.Integer, primary_key=True)
+    change_seq: Mapped[int] = mapped_column(db.Integer, nullable=False, index=True)
+    deleted_at: Mapped[datetime] = mapped_column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, ticket_id, change_seq):
+        """
+        @brief Constructor para la clase TicketTombstone.
+
+        @param ticket_id ID del ticket eliminado.
+        @param change_seq Secuencia de cambios de la eliminación.
+        """
+        self.ticket_id = ticket_id
+        self.change_seq = change_seq
+
+    def to_dict(self):
+        return {
+            'id': self.ticket_id,
+            'change_seq': self.change_seq,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None
+        }
+
+    def __repr__(self):
+        return f'<TicketTombstone {self.ticket_id}: {self.change_seq}>'
@@ -1,102 +1,260 @@
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from Models.Ticket import Ticket
 from datetime import datetime
-from Database.database import DataBase
+from Database.database import IN_CHUNK_SIZE, SQLITE_PROFILES
 
 
 DB_PATH = Path(__file__).resolve().parent.parent / "Ticketing.db"
 
+POOL_SIZE = 5
+POOL_TIMEOUT = 5.0
+# Sentencias preparadas que sqlite3 reutiliza por conexión
+STATEMENT_CACHE_SIZE = 128
+# PRAGMA de cada conexión del pool. Con WAL un iter_all abierto no bloquea las
+# escrituras que se hacen desde otra conexión del pool mientras se recorre.
+CONNECTION_PRAGMAS = SQLITE_PROFILES['production']
+
+# Columnas de la tabla tickets de Ticketing.db
+COLUMNS = "id, client, incident, telephone_operator, service_records, messages, state, unit_equipment, created_at, updated_at"
+# Columnas que se pueden asignar al crear o actualizar
+WRITABLE_COLUMNS = ("client", "incident", "telephone_operator", "service_records", "messages", "state", "unit_equipment")
+# Nombres usados por versiones anteriores del repositorio -> nombre actual
+# (las bases con el esquema anterior se alinean con Migration/AlignTicketRepository.py)
+LEGACY_COLUMNS = {"service_record": "service_records", "message": "messages"}
+
+BATCH_SIZE = 500
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones SQLite.
+
+    Las conexiones se crean bajo demanda hasta max_size y se reutilizan entre
+    llamadas, conservando la caché de sentencias preparadas de cada una.
+    """
+
+    def __init__(self, db_path: str | Path, max_size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.db_path = Path(db_path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for name, value in CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.max_size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No hay conexiones libres en el pool ({self.max_size})")
+
+    def release(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
 
 class TicketRepository:
-    def __init__(self, db_path: str | Path = None):
+    def __init__(self, db_path: str | Path = None, pool_size: int = POOL_SIZE):
         self.db_path = Path(db_path) if db_path else DB_PATH
+        self._pool = ConnectionPool(self.db_path, pool_size)
+        self._local = threading.local()
         self._ensure_db()
 
-    def _get_conn(self):
-        return sqlite3.connect(str(self.db_path))
+    @contextmanager
+    def _connection(self):
+        """
+        Conexión para una operación: la de la unidad de trabajo activa en el
+        hilo, o una del pool con commit (o rollback) al terminar.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._pool.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.release(conn)
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Agrupa varias operaciones del repositorio en una sola transacción.
+
+            with repo.unit_of_work():
+                ticket_id = repo.create(client="Cliente")
+                repo.update(ticket_id, state="in_progress")
+
+        Hace commit al salir del bloque o rollback si se produce una excepción.
+        Los bloques anidados comparten la transacción del más externo.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield self
+            return
+
+        conn = self._pool.acquire()
+        self._local.conn = conn
+        try:
+            yield self
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._pool.release(conn)
+
+    def close(self):
+        self._pool.close()
 
     def _ensure_db(self):
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS ticket (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client TEXT,
-                incident TEXT,
-                telephone_operator TEXT,
-                service_record TEXT,
-                message TEXT,
-                state TEXT,
-                created_at TEXT,
-                updated_at TEXT
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tickets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    client TEXT,
+                    incident TEXT,
+                    telephone_operator TEXT,
+                    service_records TEXT,
+                    messages TEXT,
+                    state TEXT,
+                    unit_equipment TEXT,
+                    created_at TEXT,
+                    updated_at TEXT
+                )
+                """
             )
-            """
-        )
-        conn.commit()
-        conn.close()
 
     def create(self, client: str = None, incident: str = None, message: str = "") -> int:
         now = datetime.now().isoformat()
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO tickets (client, incident, message, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
-            (client, incident, message, "open", now, now),
-        )
-        conn.commit()
-        ticket_id = cur.lastrowid
-        conn.close()
-        return ticket_id
+        with self._connection() as conn:
+            cur = conn.execute(
+                "INSERT INTO tickets (client, incident, messages, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (client, incident, message, "open", now, now),
+            )
+            return cur.lastrowid
+
+    def create_many(self, rows) -> int:
+        """
+        Inserta muchos tickets con executemany en una sola transacción.
+
+        Cada fila es un diccionario con las claves de WRITABLE_COLUMNS
+        (opcionales). Devuelve la cantidad de tickets insertados.
+        """
+        now = datetime.now().isoformat()
+        defaults = {"messages": "", "state": "open"}
+        params = [
+            tuple(row.get(column, defaults.get(column)) for column in WRITABLE_COLUMNS) + (now, now)
+            for row in ({LEGACY_COLUMNS.get(k, k): v for k, v in row.items()} for row in rows)
+        ]
+        if not params:
+            return 0
+        with self._connection() as conn:
+            cur = conn.executemany(
+                f"INSERT INTO tickets ({', '.join(WRITABLE_COLUMNS)}, created_at, updated_at) "
+                f"VALUES ({', '.join('?' * (len(WRITABLE_COLUMNS) + 2))})",
+                params,
+            )
+            return cur.rowcount
 
     def get_all(self):
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT id, client, incident, telephone_operator, service_record, message, state, created_at, updated_at FROM tickets ORDER BY id DESC")
-        rows = cur.fetchall()
-        conn.close()
-        tickets = []
-        for r in rows:
-            tickets.append({
-                "id": r[0],
-                "client": r[1],
-                "incident": r[2],
-                "telephone_operator": r[3],
-                "service_record": r[4],
-                "message": r[5],
-                "state": r[6],
-                "created_at": r[7],
-                "updated_at": r[8],
-            })
-        return tickets
+        with self._connection() as conn:
+            rows = conn.execute(f"SELECT {COLUMNS} FROM tickets ORDER BY id DESC").fetchall()
+        return [dict(r) for r in rows]
+
+    def iter_all(self, batch_size: int = BATCH_SIZE):
+        """
+        Recorre todos los tickets leyendo de a batch_size filas con fetchmany.
+
+        Devuelve sqlite3.Row (acceso por índice o por nombre de columna) sin
+        cargar la tabla completa en memoria. La conexión queda tomada del pool
+        hasta que se agota o se cierra el iterador; como las conexiones usan
+        WAL, se puede escribir con el repositorio mientras se recorre:
+
+            for row in repo.iter_all():
+                repo.update(row["id"], state="closed")
+        """
+        with self._connection() as conn:
+            cur = conn.execute(f"SELECT {COLUMNS} FROM tickets ORDER BY id")
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def get_many(self, ticket_ids) -> list:
+        """
+        Obtiene varios tickets por id como sqlite3.Row, ordenados por id.
+
+        Los ids inexistentes se omiten.
+        """
+        ids = list(dict.fromkeys(ticket_ids))
+        rows = []
+        with self._connection() as conn:
+            for start in range(0, len(ids), IN_CHUNK_SIZE):
+                chunk = ids[start:start + IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                rows.extend(conn.execute(f"SELECT {COLUMNS} FROM tickets WHERE id IN ({placeholders})", chunk))
+        rows.sort(key=lambda r: r["id"])
+        return rows
 
     def get_by_id(self, ticket_id: int):
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT id, client, incident, telephone_operator, service_record, message, state, created_at, updated_at FROM tickets WHERE id = ?", (ticket_id,))
-        r = cur.fetchone()
-        conn.close()
-        if not r:
-            return None
-        return {
-            "id": r[0],
-            "client": r[1],
-            "incident": r[2],
-            "telephone_operator": r[3],
-            "service_record": r[4],
-            "message": r[5],
-            "state": r[6],
-            "created_at": r[7],
-            "updated_at": r[8],
-        }
+        with self._connection() as conn:
+            r = conn.execute(f"SELECT {COLUMNS} FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
+        return dict(r) if r else None
 
     def update(self, ticket_id: int, **fields) -> bool:
-        allowed = ["client", "incident", "telephone_operator", "service_record", "message", "state"]
         set_parts = []
         values = []
         for k, v in fields.items():
-            if k in allowed:
+            k = LEGACY_COLUMNS.get(k, k)
+            if k in WRITABLE_COLUMNS:
                 set_parts.append(f"{k} = ?")
                 values.append(v)
         if not set_parts:
@@ -104,19 +262,11 @@ class TicketRepository:
         values.append(datetime.now().isoformat())
         values.append(ticket_id)
         sql = f"UPDATE tickets SET {', '.join(set_parts)}, updated_at = ? WHERE id = ?"
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute(sql, tuple(values))
-        conn.commit()
-        updated = cur.rowcount > 0
-        conn.close()
-        return updated
+        with self._connection() as conn:
+            cur = conn.execute(sql, tuple(values))
+            return cur.rowcount > 0
 
     def delete(self, ticket_id: int) -> bool:
-        conn = self._get_conn()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
-        conn.commit()
-        deleted = cur.rowcount > 0
-        conn.close()
-        return deleted
+        with self._connection() as conn:
+            cur = conn.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+            return cur.rowcount > 0
@@ -0,0 +1,337 @@
+"""
+@brief Reoptimización masiva de tickets activos sin hidratar objetos del ORM.
+
+@details El motor trabaja en cuatro fases:
+         1. Lectura: solo las columnas necesarias de los tickets activos
+            (incluida repair_type), con consultas Core.
+         2. Clasificación: códigos de tipo de reparación a partir de la
+            columna repair_type (sin leer los incidentes).
+         3. Búsqueda: siguiente paso y tiempo total en tablas precalculadas a
+            partir de route_table (índice [tipo de reparación, ubicación]),
+            con NumPy si está instalado o con listas si no; o bien con la
+            librería nativa, que resuelve todos los tickets en una sola
+            llamada (Ticket.batch_calculate_next_steps).
+         4. Escritura: un UPDATE por clave primaria ejecutado como executemany,
+            solo para los tickets cuyo resultado cambió.
+
+         Los tickets con una ubicación que no pertenece al grafo se resuelven
+         uno a uno con Ticket.calculate_optimal_workflow.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select, update
+from Config import WorkshopLayout
+from Config.WorkshopLayout import REPAIR_TYPES
+from Database.database import db, IN_CHUNK_SIZE
+from Database.ChangeTracking import bump_version
+from Models.Ticket import Ticket
+from Routing import NativeRouting
+from Routing.RouteTable import route_table
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+END_LOCATION = 'terminado'
+REPAIR_TYPE_CODES = {repair_type: code for code, repair_type in enumerate(REPAIR_TYPES)}
+
+# Filas leídas por lote en la fase de lectura
+READ_BATCH_SIZE = 5000
+
+# Backends de la fase de búsqueda, en orden de preferencia. El nativo se elige
+# solo a pedido: armar los buffers y traducir los resultados cuesta, con 20k
+# tickets, algo más que buscar en las tablas con listas.
+LOOKUP_BACKENDS = ('numpy', 'python', 'native')
+# Backend fijo para todas las optimizaciones (por defecto el primero disponible)
+DEFAULT_BACKEND = os.environ.get('TICKETING_BATCH_BACKEND')
+
+
+def available_backends():
+    """
+    @brief Backends de búsqueda utilizables en este proceso, en orden de preferencia.
+    """
+    available = {
+        'numpy': np is not None,
+        'python': True,
+        'native': NativeRouting.is_available()
+    }
+    return [backend for backend in LOOKUP_BACKENDS if available[backend]]
+
+
+def resolve_backend(backend=None):
+    """
+    @brief Elige el backend de búsqueda.
+
+    @param backend Backend pedido, o None para usar TICKETING_BATCH_BACKEND o
+           el primero disponible.
+    @return Nombre del backend.
+    @throws ValueError Si el backend no existe o no está disponible.
+    """
+    backend = backend or DEFAULT_BACKEND
+    available = available_backends()
+    if backend is None:
+        return available[0]
+    if backend not in available:
+        raise ValueError(f"Backend no disponible: {backend}. Valores permitidos: {available}")
+    return backend
+
+
+class LookupTables:
+    """
+    @brief Siguiente paso y tiempo total hacia 'terminado' por (tipo de reparación, ubicación).
+
+    @details next_step[tipo][ubicación] es el índice del nodo siguiente, o -1
+             si no hay ruta; total_time[tipo][ubicación] es el tiempo en minutos.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        graph = WorkshopLayout.WorkshopGraph
+        self.nodes = list(graph)
+        for edges in graph.values():
+            for node in edges:
+                if node not in self.nodes:
+                    self.nodes.append(node)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+
+        self.next_step = []
+        self.total_time = []
+        for repair_type in REPAIR_TYPES:
+            next_row = []
+            total_row = []
+            for node in self.nodes:
+                route = route_table.lookup(node, END_LOCATION, repair_type)
+                if route is None:
+                    next_row.append(-1)
+                    total_row.append(-1)
+                else:
+                    path, total = route
+                    next_row.append(self.index[path[1] if len(path) > 1 else END_LOCATION])
+                    total_row.append(total)
+            self.next_step.append(next_row)
+            self.total_time.append(total_row)
+
+        if np is not None:
+            self.next_step = np.array(self.next_step, dtype=np.int32)
+            self.total_time = np.array(self.total_time, dtype=np.int32)
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def get_lookup_tables():
+    """
+    @brief Devuelve las tablas de búsqueda de la versión actual del layout.
+    """
+    global _tables
+    version = WorkshopLayout.get_layout_version()
+    tables = _tables
+    if tables is not None and tables.version == version:
+        return tables
+
+    with _tables_lock:
+        if _tables is None or _tables.version != version:
+            _tables = LookupTables(version)
+        return _tables
+
+
+class BatchResult:
+    """
+    @brief Resultado de una reoptimización masiva.
+    """
+
+    def __init__(self, backend):
+        self.optimized = 0
+        self.updated_ids = []
+        self.timings = {}
+        self.backend = backend
+
+    def to_dict(self):
+        return {
+            'optimized_tickets': self.optimized,
+            'updated_tickets': len(self.updated_ids),
+            'backend': self.backend,
+            'native_routing': NativeRouting.get_status(),
+            'timings_ms': {phase: round(seconds * 1000, 2) for phase, seconds in self.timings.items()}
+        }
+
+
+class _PhaseTimer:
+    def __init__(self, timings):
+        self.timings = timings
+        self.start = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.timings[phase] = now - self.start
+        self.start = now
+
+
+def _read_tickets(session):
+    active = Ticket.current_location != END_LOCATION
+    result = session.execute(
+        select(Ticket.id, Ticket.current_location, Ticket.repair_type,
+               Ticket.recommended_next_step, Ticket.estimated_process_time)
+        .where(active)
+        .order_by(Ticket.id)
+        .execution_options(yield_per=READ_BATCH_SIZE)
+    )
+    ids, locations, repair_types, next_steps, totals = [], [], [], [], []
+    for row in result:
+        ids.append(row[0])
+        locations.append(row[1])
+        repair_types.append(row[2])
+        next_steps.append(row[3])
+        totals.append(row[4])
+    return ids, locations, repair_types, next_steps, totals
+
+
+def _classify(repair_types):
+    """
+    @brief Código de tipo de reparación de cada ticket.
+    """
+    standard = REPAIR_TYPE_CODES['standard']
+    return [REPAIR_TYPE_CODES.get(repair_type, standard) for repair_type in repair_types]
+
+
+def _lookup(tables, locations, type_codes, next_steps, totals, vectorized):
+    """
+    @brief Calcula el siguiente paso y el tiempo total de todos los tickets.
+
+    @param vectorized True para resolver con indexación de arreglos NumPy.
+    @return Tupla (nuevos_siguientes, nuevos_totales, cambiados) donde
+            cambiados son las posiciones cuyo resultado difiere del guardado,
+            y los siguientes son índices de nodo (-1 = ubicación sin ruta).
+    """
+    index = tables.index
+    location_codes = [index.get(location, -1) for location in locations]
+    current_next = [index.get(step, -2) if step is not None else -2 for step in next_steps]
+    current_total = [total if total is not None else -1 for total in totals]
+
+    if vectorized:
+        location_codes = np.array(location_codes, dtype=np.int32)
+        type_codes = np.array(type_codes, dtype=np.int32)
+        known = location_codes >= 0
+        new_next = np.full(len(location_codes), -1, dtype=np.int32)
+        new_total = np.full(len(location_codes), -1, dtype=np.int32)
+        new_next[known] = tables.next_step[type_codes[known], location_codes[known]]
+        new_total[known] = tables.total_time[type_codes[known], location_codes[known]]
+        changed = np.flatnonzero(
+            (new_next >= 0)
+            & ((new_next != np.array(current_next, dtype=np.int32))
+               | (new_total != np.array(current_total, dtype=np.int64)))
+        )
+        return new_next.tolist(), new_total.tolist(), changed.tolist()
+
+    new_next = []
+    new_total = []
+    changed = []
+    next_step = tables.next_step
+    total_time = tables.total_time
+    for position, (location, repair_type) in enumerate(zip(location_codes, type_codes)):
+        if location < 0:
+            new_next.append(-1)
+            new_total.append(-1)
+            continue
+        step = next_step[repair_type][location]
+        total = total_time[repair_type][location]
+        new_next.append(step)
+        new_total.append(total)
+        if step >= 0 and (step != current_next[position] or total != current_total[position]):
+            changed.append(position)
+    return new_next, new_total, changed
+
+
+def _lookup_native(tables, locations, repair_types, next_steps, totals):
+    """
+    @brief Igual que _lookup, pero resuelve todos los tickets con una sola llamada nativa.
+
+    @details Los siguientes pasos se traducen a los índices de nodo de las
+             tablas para que la fase de escritura no dependa del backend.
+    """
+    resolved = Ticket.batch_calculate_next_steps(locations, repair_types, END_LOCATION)
+    if resolved is None:
+        raise RuntimeError(NativeRouting.LOAD_ERROR or "La librería nativa no está disponible")
+
+    index = tables.index
+    new_next = []
+    new_total = []
+    changed = []
+    for position, (step, total) in enumerate(zip(*resolved)):
+        if step is None:
+            new_next.append(-1)
+            new_total.append(-1)
+            continue
+        new_next.append(index[step])
+        new_total.append(total)
+        if step != next_steps[position] or total != totals[position]:
+            changed.append(position)
+    return new_next, new_total, changed
+
+
+def optimize_active_tickets(session=None, backend=None):
+    """
+    @brief Recalcula el siguiente paso y el tiempo estimado de todos los tickets activos.
+
+    @details No hace commit: el llamador confirma la transacción. Los tickets
+             escritos reciben una nueva secuencia de cambios (change_seq).
+
+    @param session Sesión a usar (por defecto db.session).
+    @param backend Backend de búsqueda (ver resolve_backend).
+    @return BatchResult con la cantidad de tickets, los ids actualizados y los
+            tiempos por fase.
+    """
+    session = session if session is not None else db.session
+    result = BatchResult(resolve_backend(backend))
+    timer = _PhaseTimer(result.timings)
+
+    ids, locations, repair_types, next_steps, totals = _read_tickets(session)
+    timer.lap('read')
+
+    type_codes = _classify(repair_types)
+    timer.lap('classify')
+
+    tables = get_lookup_tables()
+    if result.backend == 'native':
+        new_next, new_total, changed = _lookup_native(tables, locations, repair_types, next_steps, totals)
+    else:
+        new_next, new_total, changed = _lookup(tables, locations, type_codes, next_steps, totals,
+                                               result.backend == 'numpy')
+    unresolved = [ids[position] for position, step in enumerate(new_next) if step < 0]
+    timer.lap('lookup')
+
+    if changed:
+        seq = bump_version(session)
+        now = datetime.utcnow()
+        nodes = tables.nodes
+        session.execute(
+            update(Ticket),
+            [
+                {
+                    'id': ids[position],
+                    'recommended_next_step': nodes[new_next[position]],
+                    'estimated_process_time': new_total[position],
+                    'updated_at': now,
+                    'change_seq': seq
+                }
+                for position in changed
+            ],
+            execution_options={'synchronize_session': False}
+        )
+        result.updated_ids = [ids[position] for position in changed]
+
+    # Ubicaciones fuera del grafo: cálculo individual (se escriben en el flush)
+    for start in range(0, len(unresolved), IN_CHUNK_SIZE):
+        chunk = unresolved[start:start + IN_CHUNK_SIZE]
+        for ticket in session.scalars(select(Ticket).where(Ticket.id.in_(chunk))):
+            ticket.calculate_optimal_workflow()
+            if session.is_modified(ticket):
+                result.updated_ids.append(ticket.id)
+    timer.lap('write')
+
+    result.optimized = len(ids)
+    return result
@@ -0,0 +1,75 @@
+"""
+@brief Ruteo que tiene en cuenta la carga de cada estación del taller.
+
+@details A los pesos estáticos de WorkshopGraph se les suma, en cada arista,
+         la demora esperada en la cola de la estación de destino. La demora se
+         estima a partir de la ocupación actual, la cantidad de puestos
+         (StationCapacity) y el tiempo de atención (StationServiceTime): con
+         n equipos en una estación de c puestos, un equipo que llega espera
+         max(0, n - c + 1) atenciones, y los puestos liberan uno cada
+         StationServiceTime / c minutos.
+"""
+from Config import WorkshopLayout
+from Routing import PythonDijkstra
+
+END_LOCATION = 'terminado'
+
+
+def queue_delay(station, occupancy):
+    """
+    @brief Minutos que espera un equipo que llega a la estación.
+
+    @param station Nombre de la estación.
+    @param occupancy Equipos que ya están en la estación.
+    """
+    capacity = WorkshopLayout.StationCapacity.get(station)
+    if not capacity:
+        return 0
+    waiting = occupancy - capacity + 1
+    if waiting <= 0:
+        return 0
+    return waiting * WorkshopLayout.StationServiceTime.get(station, 0) / capacity
+
+
+def queue_delays(counts):
+    """
+    @brief Demora de cola de cada estación para una ocupación dada.
+
+    @param counts Diccionario {estación: equipos}
+    @return Diccionario {estación: minutos}, solo con las estaciones con demora.
+    """
+    delays = {}
+    for station, occupancy in counts.items():
+        delay = queue_delay(station, occupancy)
+        if delay > 0:
+            delays[station] = delay
+    return delays
+
+
+def load_aware_graph(repair_type, delays):
+    """
+    @brief Grafo del tipo de reparación con la demora de cola sumada a cada arista.
+
+    @details Parte de la vista inmutable de PythonDijkstra y devuelve un grafo
+             nuevo; el original no se modifica.
+    """
+    view = PythonDijkstra.get_weight_view(repair_type)
+    return {
+        origin: {destination: weight + delays.get(destination, 0) for destination, weight in edges.items()}
+        for origin, edges in view.items()
+    }
+
+
+def shortest_path(start, repair_type, delays, end=END_LOCATION):
+    """
+    @brief Camino de menor tiempo total (traslados + colas) hasta el destino.
+
+    @return Tupla (camino, tiempo_de_traslado, tiempo_en_cola) en minutos, o
+            None si no existe camino.
+    """
+    route = PythonDijkstra.shortest_path(load_aware_graph(repair_type, delays), start, end)
+    if route is None:
+        return None
+    path, total = route
+    queue_time = sum(delays.get(station, 0) for station in path[1:])
+    return path, total - queue_time, queue_time
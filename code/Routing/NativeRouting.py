@@ -0,0 +1,252 @@
+"""
+@brief Backend nativo de rutas (librería Dijkstra en C++).
+
+@details La librería se resuelve una sola vez al importar el módulo: se elige el
+         archivo correcto para la plataforma (.dll en Windows, .so en el resto),
+         se configuran las firmas de las funciones y se recuerda si la carga
+         falló para no volver a intentarlo en cada cálculo.
+
+         El grafo del taller se copia a memoria nativa en formato CSR (un
+         handle por versión del layout y tipo de reparación) y las consultas
+         por lote se hacen contra esos handles. Las rutas individuales salen
+         de route_table (Routing.RouteTable), sin cruzar a la librería.
+"""
+import ctypes
+import os
+import sys
+import threading
+import weakref
+from array import array
+from Config import WorkshopLayout
+from Config.WorkshopLayout import REPAIR_TYPES
+from Routing.RouteTable import build_weighted_graph
+
+
+BACKEND_NATIVE = 'native'
+BACKEND_PYTHON = 'python'
+
+_DIJKSTRA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Dijkstra'))
+
+_INT32_P = ctypes.POINTER(ctypes.c_int32)
+
+REPAIR_TYPE_IDS = {repair_type: i for i, repair_type in enumerate(REPAIR_TYPES)}
+
+
+def _library_path():
+    """
+    @brief Devuelve la ruta de la librería compilada para la plataforma actual.
+    """
+    if sys.platform.startswith('win'):
+        return os.path.join(_DIJKSTRA_DIR, 'Dijkstra.dll')
+    return os.path.join(_DIJKSTRA_DIR, 'dijkstra.so')
+
+
+def _load_library(path):
+    """
+    @brief Carga la librería y configura las firmas de sus funciones.
+
+    @return Tupla (librería, error). Si la carga falla, la librería es None
+            y error describe el motivo.
+    """
+    if not os.path.exists(path):
+        return None, f"No se encuentra la librería en: {path}"
+
+    try:
+        library = ctypes.CDLL(path)
+
+        library.dijkstra_load_graph.argtypes = [ctypes.c_int32, _INT32_P, _INT32_P, _INT32_P]
+        library.dijkstra_load_graph.restype = ctypes.c_void_p
+        library.dijkstra_free_graph.argtypes = [ctypes.c_void_p]
+        library.dijkstra_free_graph.restype = None
+        library.dijkstra_batch_next_steps.argtypes = [
+            ctypes.POINTER(ctypes.c_void_p), ctypes.c_int32, ctypes.c_int32,
+            _INT32_P, _INT32_P, ctypes.c_int32, _INT32_P, _INT32_P
+        ]
+        library.dijkstra_batch_next_steps.restype = ctypes.c_int32
+    except (OSError, AttributeError) as e:
+        return None, str(e)
+
+    return library, None
+
+
+LIBRARY_PATH = _library_path()
+_library, LOAD_ERROR = _load_library(LIBRARY_PATH)
+ACTIVE_BACKEND = BACKEND_NATIVE if _library is not None else BACKEND_PYTHON
+
+
+def get_active_backend():
+    """
+    @brief Indica qué backend de rutas está activo ('native' o 'python').
+    """
+    return ACTIVE_BACKEND
+
+
+def get_status():
+    """
+    @brief Estado de la librería nativa, para informarlo en las respuestas de la API.
+
+    @return Diccionario con el backend activo, el archivo de la librería y el
+            motivo del fallo de carga (None si se cargó).
+    """
+    return {
+        'backend': get_active_backend(),
+        'library': os.path.basename(LIBRARY_PATH),
+        'error': LOAD_ERROR
+    }
+
+
+def is_available():
+    """
+    @brief Indica si la librería nativa se cargó correctamente.
+    """
+    return _library is not None
+
+
+def _int32_buffer(values):
+    """
+    @brief Devuelve un puntero ctypes a un array('i') sin copiar los datos.
+    """
+    if not values:
+        return None
+    return (ctypes.c_int32 * len(values)).from_buffer(values)
+
+
+def build_csr(graph):
+    """
+    @brief Convierte el grafo de Python a formato CSR compatible con C++.
+
+    @param graph Grafo en formato {origen: {destino: peso}}
+    @return Tupla (nodos, índices, offsets, targets, weights) donde los tres
+            últimos son array('i') listos para pasar a la librería.
+    """
+    nodes = list(graph.keys())
+    for edges in graph.values():
+        for node in edges:
+            if node not in graph and node not in nodes:
+                nodes.append(node)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    offsets = array('i', [0])
+    targets = array('i')
+    weights = array('i')
+    for node in nodes:
+        for destination, weight in graph.get(node, {}).items():
+            targets.append(index[destination])
+            weights.append(int(weight))
+        offsets.append(len(targets))
+
+    return nodes, index, offsets, targets, weights
+
+
+class NativeGraph:
+    """
+    @brief Grafo residente en memoria nativa.
+
+    @details Mantiene el handle devuelto por dijkstra_load_graph y lo libera
+             cuando el objeto se descarta o se llama a close().
+    """
+
+    def __init__(self, graph):
+        if _library is None:
+            raise RuntimeError(LOAD_ERROR or "La librería nativa no está disponible")
+
+        self.nodes, self.index, offsets, targets, weights = build_csr(graph)
+        self.handle = _library.dijkstra_load_graph(
+            len(self.nodes), _int32_buffer(offsets), _int32_buffer(targets), _int32_buffer(weights)
+        )
+        if not self.handle:
+            raise RuntimeError("La librería no pudo cargar el grafo")
+
+        self._finalizer = weakref.finalize(self, _library.dijkstra_free_graph, self.handle)
+
+    def close(self):
+        """
+        @brief Libera el grafo nativo.
+        """
+        self._finalizer()
+
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def get_native_graph(repair_type):
+    """
+    @brief Devuelve el grafo nativo para el tipo de reparación.
+
+    @details Se carga una vez por (versión del layout, tipo de reparación); al
+             cambiar el layout se carga uno nuevo y el anterior se libera
+             cuando deja de estar en uso.
+
+    @return NativeGraph, o None si la librería no está disponible.
+    """
+    if _library is None:
+        return None
+
+    version = WorkshopLayout.get_layout_version()
+    entry = _graphs.get(repair_type)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    with _graphs_lock:
+        entry = _graphs.get(repair_type)
+        if entry is None or entry[0] != version:
+            entry = (version, NativeGraph(build_weighted_graph(repair_type)))
+            _graphs[repair_type] = entry
+    return entry[1]
+
+
+_batch_lock = threading.Lock()
+
+
+def get_node_ids():
+    """
+    @brief Devuelve el mapeo {ubicación: id} usado por los grafos nativos.
+
+    @return Diccionario de ids, o None si la librería no está disponible.
+    """
+    graph = get_native_graph(REPAIR_TYPES[0])
+    return graph.index if graph is not None else None
+
+
+def batch_next_steps(start_ids, repair_type_ids, end, out_next, out_total):
+    """
+    @brief Resuelve el siguiente paso y el tiempo total de muchos tickets en una sola llamada.
+
+    @details Todos los buffers son array('i') del mismo tamaño reservados por
+             quien llama; la librería lee y escribe directamente sobre ellos sin
+             copias intermedias. Los tickets sin camino quedan con -1.
+
+    @param start_ids Ids de las ubicaciones de origen (ver get_node_ids)
+    @param repair_type_ids Índices en REPAIR_TYPES
+    @param end Ubicación de destino
+    @param out_next Buffer de salida con el id del siguiente paso
+    @param out_total Buffer de salida con el tiempo total
+    @return Cantidad de tickets resueltos, o None si la librería no está disponible.
+    """
+    count = len(start_ids)
+    if not (len(repair_type_ids) == len(out_next) == len(out_total) == count):
+        raise ValueError("Los buffers del lote deben tener el mismo tamaño")
+
+    graphs = [get_native_graph(repair_type) for repair_type in REPAIR_TYPES]
+    if graphs[0] is None:
+        return None
+
+    end_id = graphs[0].index.get(end)
+    if end_id is None:
+        return 0
+    if count == 0:
+        return 0
+
+    handles = (ctypes.c_void_p * len(graphs))(*[graph.handle for graph in graphs])
+
+    # El árbol hacia el destino se guarda dentro de cada grafo nativo
+    with _batch_lock:
+        solved = _library.dijkstra_batch_next_steps(
+            handles, len(graphs), end_id,
+            _int32_buffer(start_ids), _int32_buffer(repair_type_ids), count,
+            _int32_buffer(out_next), _int32_buffer(out_total)
+        )
+    if solved < 0:
+        raise RuntimeError("Argumentos inválidos en el cálculo por lote")
+    return solved
@@ -0,0 +1,84 @@
+"""
+@brief Implementación de Dijkstra en Python puro.
+
+@details Se usa cuando la librería nativa no está disponible. Trabaja sobre
+         vistas inmutables del grafo por tipo de reparación, que se comparten
+         entre hilos sin riesgo de que un cálculo altere los pesos de otro.
+"""
+import heapq
+import threading
+from types import MappingProxyType
+from Config import WorkshopLayout
+from Routing.RouteTable import build_weighted_graph
+
+
+_views = {}
+_views_lock = threading.Lock()
+
+
+def get_weight_view(repair_type):
+    """
+    @brief Devuelve la vista inmutable del grafo para el tipo de reparación.
+
+    @details La vista se construye una vez por (versión del layout, tipo de
+             reparación). Tanto el grafo como cada lista de aristas son de solo
+             lectura.
+
+    @param repair_type Tipo de reparación ('simple', 'complex', 'standard')
+    @return Mapping {origen: {destino: peso}} de solo lectura
+    """
+    version = WorkshopLayout.get_layout_version()
+    entry = _views.get(repair_type)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    with _views_lock:
+        entry = _views.get(repair_type)
+        if entry is None or entry[0] != version:
+            weighted = build_weighted_graph(repair_type)
+            view = MappingProxyType({node: MappingProxyType(edges) for node, edges in weighted.items()})
+            entry = (version, view)
+            _views[repair_type] = entry
+    return entry[1]
+
+
+def shortest_path(graph, start, end):
+    """
+    @brief Calcula el camino mínimo con una cola de prioridad (heapq).
+
+    @details La búsqueda termina en cuanto se extrae el destino de la cola.
+
+    @param graph Mapping {origen: {destino: peso}}
+    @param start Ubicación de origen
+    @param end Ubicación de destino
+    @return Tupla (camino, tiempo_total) o None si no existe camino.
+    """
+    if start not in graph:
+        return None
+
+    distances = {start: 0}
+    previous = {}
+    heap = [(0, start)]
+
+    while heap:
+        distance, current = heapq.heappop(heap)
+
+        if current == end:
+            path = [current]
+            while current in previous:
+                current = previous[current]
+                path.append(current)
+            path.reverse()
+            return path, distance
+
+        if distance > distances[current]:
+            continue
+
+        for neighbor, weight in graph.get(current, {}).items():
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                previous[neighbor] = current
+                heapq.heappush(heap, (new_distance, neighbor))
+
+    return None
@@ -0,0 +1,164 @@
+import threading
+from Config import WorkshopLayout
+
+
+def build_weighted_graph(repair_type, graph=None):
+    """
+    @brief Construye una copia del grafo con los pesos ajustados al tipo de reparación.
+
+    @details No modifica el grafo original: aplica los ajustes definidos en
+             RepairTypeWeights sobre una copia.
+
+    @param repair_type Tipo de reparación ('simple', 'complex', 'standard')
+    @param graph Grafo base (por defecto WorkshopGraph)
+    @return Diccionario {origen: {destino: peso}}
+    """
+    base = graph if graph is not None else WorkshopLayout.WorkshopGraph
+    weighted = {node: dict(edges) for node, edges in base.items()}
+
+    for (origin, destination), weight in WorkshopLayout.RepairTypeWeights.get(repair_type, {}).items():
+        if origin in weighted and destination in weighted[origin]:
+            weighted[origin][destination] = weight
+
+    return weighted
+
+
+class _AllPairsTable:
+    """
+    @brief Distancias y siguientes saltos entre todos los pares de nodos.
+
+    @details Se calcula con Floyd–Warshall; los caminos completos se reconstruyen
+             una sola vez por par y quedan memorizados.
+    """
+
+    def __init__(self, graph, version):
+        self.version = version
+        self.nodes = list(graph.keys())
+        for edges in graph.values():
+            for node in edges:
+                if node not in graph and node not in self.nodes:
+                    self.nodes.append(node)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+
+        n = len(self.nodes)
+        inf = float('inf')
+        dist = [[inf] * n for _ in range(n)]
+        nxt = [[None] * n for _ in range(n)]
+
+        for i in range(n):
+            dist[i][i] = 0
+            nxt[i][i] = i
+        for origin, edges in graph.items():
+            i = self.index[origin]
+            for destination, weight in edges.items():
+                j = self.index[destination]
+                if weight < dist[i][j]:
+                    dist[i][j] = weight
+                    nxt[i][j] = j
+
+        for k in range(n):
+            dist_k = dist[k]
+            for i in range(n):
+                dist_ik = dist[i][k]
+                if dist_ik == inf:
+                    continue
+                dist_i = dist[i]
+                nxt_i = nxt[i]
+                nxt_ik = nxt_i[k]
+                for j in range(n):
+                    candidate = dist_ik + dist_k[j]
+                    if candidate < dist_i[j]:
+                        dist_i[j] = candidate
+                        nxt_i[j] = nxt_ik
+
+        self.dist = dist
+        self.next_hop = nxt
+        self._routes = {}
+
+    def route(self, start, end):
+        """
+        @brief Devuelve (camino, tiempo_total) o None si no hay ruta.
+        """
+        key = (start, end)
+        route = self._routes.get(key)
+        if route is not None or key in self._routes:
+            return route
+
+        i = self.index.get(start)
+        j = self.index.get(end)
+        if i is None or j is None or self.next_hop[i][j] is None:
+            route = None
+        else:
+            path = [start]
+            current = i
+            while current != j:
+                current = self.next_hop[current][j]
+                path.append(self.nodes[current])
+            route = (tuple(path), self.dist[i][j])
+
+        self._routes[key] = route
+        return route
+
+
+class RouteTable:
+    """
+    @brief Motor de rutas precalculadas para el grafo del taller.
+
+    @details Calcula los caminos mínimos entre todos los pares de ubicaciones
+             una vez por (versión del layout, tipo de reparación). Las consultas
+             posteriores son búsquedas en memoria. Las tablas se recalculan solo
+             cuando cambia la versión del layout (ver notify_layout_changed).
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def _get_table(self, repair_type):
+        version = WorkshopLayout.get_layout_version()
+        table = self._tables.get(repair_type)
+        if table is not None and table.version == version:
+            return table
+
+        with self._lock:
+            table = self._tables.get(repair_type)
+            if table is None or table.version != version:
+                table = _AllPairsTable(build_weighted_graph(repair_type), version)
+                self._tables[repair_type] = table
+        return table
+
+    def lookup(self, start, end, repair_type):
+        """
+        @brief Busca la ruta óptima precalculada.
+
+        @param start Ubicación de origen
+        @param end Ubicación de destino
+        @param repair_type Tipo de reparación ('simple', 'complex', 'standard')
+        @return Tupla (camino, tiempo_total) o None si no existe ruta
+        """
+        return self._get_table(repair_type).route(start, end)
+
+    def get_path(self, start, end, repair_type):
+        """
+        @brief Devuelve el camino óptimo como lista, o None si no existe.
+        """
+        route = self.lookup(start, end, repair_type)
+        return list(route[0]) if route else None
+
+    def get_total_time(self, start, end, repair_type):
+        """
+        @brief Devuelve el tiempo total del camino óptimo, o None si no existe.
+        """
+        route = self.lookup(start, end, repair_type)
+        return route[1] if route else None
+
+    def invalidate(self):
+        """
+        @brief Descarta todas las tablas calculadas.
+        """
+        with self._lock:
+            self._tables.clear()
+
+
+# Instancia compartida por todo el proceso
+route_table = RouteTable()
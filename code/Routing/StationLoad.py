@@ -0,0 +1,159 @@
+"""
+@brief Contador en memoria de equipos por estación del taller.
+
+@details Los hooks de la sesión acumulan en cada flush los cambios de
+         current_location (altas, movimientos y bajas de tickets) y los aplican
+         al contador solo cuando la transacción se confirma; un rollback los
+         descarta. Las escrituras que no pasan por el flush (INSERT masivos)
+         deben llamar a mark_stale(), y además el contador se vuelve a leer de
+         la base cada cierto tiempo para corregir la deriva y los cambios
+         hechos por otros workers.
+"""
+import os
+import threading
+import time
+from flask import Flask
+from sqlalchemy import event, func, inspect, select
+from Database.database import db
+from Models.Ticket import Ticket
+
+END_LOCATION = 'terminado'
+
+# Segundos entre relecturas completas del contador desde la base
+RESYNC_INTERVAL = float(os.environ.get('TICKETING_STATION_LOAD_RESYNC', 30))
+
+_SESSION_KEY = 'station_load_deltas'
+
+
+class StationLoad:
+    """
+    @brief Cantidad de equipos activos en cada estación, segura entre hilos.
+    """
+
+    def __init__(self, resync_interval=RESYNC_INTERVAL, clock=time.monotonic):
+        self.resync_interval = resync_interval
+        self._clock = clock
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._synced_at = None
+
+    def resync(self, session=None):
+        """
+        @brief Reemplaza el contador por los valores actuales de la base.
+        """
+        session = session if session is not None else db.session
+        synced_at = self._clock()
+        rows = session.execute(
+            select(Ticket.current_location, func.count(Ticket.id))
+            .where(Ticket.current_location != END_LOCATION)
+            .group_by(Ticket.current_location)
+        )
+        counts = {location: count for location, count in rows if location is not None}
+        with self._lock:
+            self._counts = counts
+            self._synced_at = synced_at
+
+    def mark_stale(self):
+        """
+        @brief Fuerza una relectura en la próxima consulta del contador.
+        """
+        with self._lock:
+            self._synced_at = None
+
+    def apply(self, deltas):
+        """
+        @brief Suma al contador los cambios de una transacción confirmada.
+
+        @param deltas Diccionario {estación: diferencia}
+        """
+        with self._lock:
+            if self._synced_at is None:
+                return
+            for station, delta in deltas.items():
+                count = self._counts.get(station, 0) + delta
+                if count > 0:
+                    self._counts[station] = count
+                else:
+                    self._counts.pop(station, None)
+
+    def snapshot(self, session=None):
+        """
+        @brief Devuelve una copia del contador, releyéndolo si está vencido.
+
+        @return Diccionario {estación: equipos activos}
+        """
+        with self._lock:
+            synced_at = self._synced_at
+        if synced_at is None or self._clock() - synced_at >= self.resync_interval:
+            self.resync(session)
+        with self._lock:
+            return dict(self._counts)
+
+
+def _committed_location(ticket):
+    history = inspect(ticket).attrs.current_location.history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _count(deltas, location, delta):
+    if location is not None and location != END_LOCATION:
+        deltas[location] = deltas.get(location, 0) + delta
+
+
+def _before_flush(session, flush_context, instances):
+    deltas = session.info.get(_SESSION_KEY)
+    for obj in session.new:
+        if isinstance(obj, Ticket):
+            if deltas is None:
+                deltas = session.info.setdefault(_SESSION_KEY, {})
+            _count(deltas, obj.current_location or 'recepcion', 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Ticket):
+            if deltas is None:
+                deltas = session.info.setdefault(_SESSION_KEY, {})
+            _count(deltas, _committed_location(obj), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Ticket):
+            continue
+        history = inspect(obj).attrs.current_location.history
+        if not history.added:
+            continue
+        if not history.deleted:
+            # Valor anterior no cargado: no se sabe de qué estación salió
+            station_load.mark_stale()
+            continue
+        if deltas is None:
+            deltas = session.info.setdefault(_SESSION_KEY, {})
+        _count(deltas, history.deleted[0], -1)
+        _count(deltas, history.added[0], 1)
+
+
+def _after_commit(session):
+    deltas = session.info.pop(_SESSION_KEY, None)
+    if deltas:
+        station_load.apply(deltas)
+
+
+def _after_rollback(session):
+    session.info.pop(_SESSION_KEY, None)
+
+
+def init_station_load(app: Flask):
+    """
+    @brief Registra los hooks de sesión que mantienen el contador de estaciones.
+
+    @param app La instancia de la aplicación Flask (con init_db ya aplicado).
+    """
+    event.listen(db.session, 'before_flush', _before_flush)
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_rollback', _after_rollback)
+
+
+# Contador compartido por todo el proceso
+station_load = StationLoad()
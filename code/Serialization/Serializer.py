@@ -0,0 +1,129 @@
+"""
+@brief Serialización JSON de tickets e incidentes directamente a bytes.
+
+@details Cada ModelSerializer arma una sola vez la lista de columnas de su
+         modelo y un attrgetter que las lee todas en una llamada. Las fechas se
+         entregan sin convertir: orjson (si está instalado) las codifica de forma
+         nativa y el codificador de la biblioteca estándar usa isoformat(), con
+         el mismo resultado para fechas sin zona horaria.
+"""
+import json
+from datetime import date
+from operator import attrgetter
+from flask import current_app
+from sqlalchemy import select
+from Models.Ticket import Ticket
+from Models.Incident import Incident
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Tipo no serializable: {type(value).__name__}')
+
+
+if orjson is not None:
+    def dumps(data):
+        """
+        @brief Codifica un objeto como JSON en bytes (UTF-8).
+        """
+        return orjson.dumps(data)
+else:
+    def dumps(data):
+        """
+        @brief Codifica un objeto como JSON en bytes (UTF-8).
+        """
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def json_response(data, status=200):
+    """
+    @brief Respuesta application/json a partir de un objeto o de bytes ya codificados.
+    """
+    body = data if isinstance(data, bytes) else dumps(data)
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+class ModelSerializer:
+    """
+    @brief Convierte instancias de un modelo en diccionarios listos para dumps().
+
+    @details Incluye todas las columnas de la tabla del modelo y, opcionalmente,
+             relaciones serializadas con otro ModelSerializer.
+    """
+
+    def __init__(self, model, nested=None):
+        self.model = model
+        self.fields = tuple(model.__table__.columns.keys())
+
+        names = self.fields
+        getter = attrgetter(*names)
+        relations = tuple(
+            (name, attrgetter(name), serializer.many)
+            for name, serializer in (nested or {}).items()
+        )
+
+        def to_dict(obj):
+            item = dict(zip(names, getter(obj)))
+            for name, get_related, many in relations:
+                item[name] = many(get_related(obj))
+            return item
+
+        self.to_dict = to_dict
+
+    def many(self, objects):
+        """
+        @brief Serializa una secuencia de instancias.
+        """
+        return list(map(self.to_dict, objects))
+
+    def dumps(self, obj):
+        return dumps(self.to_dict(obj))
+
+    def dumps_many(self, objects):
+        return dumps(self.many(objects))
+
+
+class RowSerializer:
+    """
+    @brief Convierte filas de un select() Core de columnas fijas en diccionarios.
+
+    @details Las filas se leen como tuplas sin pasar por el ORM (sin mapa de
+             identidad ni relaciones); cada columna se guarda con su nombre.
+    """
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        self.fields = tuple(column.key for column in self.columns)
+
+    def select(self):
+        """
+        @brief Consulta base con exactamente las columnas del serializador.
+        """
+        return select(*self.columns)
+
+    def many(self, rows):
+        names = self.fields
+        return [dict(zip(names, row)) for row in rows]
+
+
+incident_serializer = ModelSerializer(Incident)
+ticket_serializer = ModelSerializer(Ticket, nested={'incidents': incident_serializer})
+
+# Vista compacta de los tickets activos para el monitor del taller
+active_ticket_rows = RowSerializer((
+    Ticket.id,
+    Ticket.client_name,
+    Ticket.unit_equipment_name,
+    Ticket.current_location,
+    Ticket.recommended_next_step,
+    Ticket.estimated_process_time,
+    Ticket.state
+))
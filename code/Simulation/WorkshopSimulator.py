@@ -0,0 +1,389 @@
+"""
+@brief Simulación de eventos discretos del taller para estimar su rendimiento.
+
+@details Cada equipo entra por 'recepcion' y recorre la ruta de su tipo de
+         reparación. Con el ruteo 'repair-type' (por defecto) visita en orden
+         las etapas de RepairType (por ejemplo 'reparacion_compleja' para los
+         equipos 'complex'), uniéndolas con los caminos mínimos de route_table.
+         Con 'shortest' sigue el camino mínimo de route_table de 'recepcion' a
+         'terminado', el mismo que recomienda Ticket.calculate_optimal_workflow;
+         con los pesos actuales ese camino pasa por 'reparacion_simple' para
+         todos los tipos, de modo que --mix no cambia las estaciones visitadas.
+         En cada estación espera un puesto
+         libre (StationCapacity, cola FIFO), se atiende durante
+         StationServiceTime minutos y luego tarda el peso de la arista en
+         llegar a la siguiente estación. Las estaciones sin capacidad definida
+         (esperas) no tienen cola.
+
+         Los eventos (llegadas a una estación) se procesan en orden de tiempo
+         con heapq. Como las llegadas a cada estación se atienden en el orden
+         en que ocurren, el inicio de la atención se calcula al llegar con un
+         heap de los instantes en que se libera cada puesto, y no hacen falta
+         eventos de salida: un equipo genera un evento por estación visitada.
+
+         Uso:
+             python Simulation/WorkshopSimulator.py --tickets 1000000 --arrival-rate 20
+             python Simulation/WorkshopSimulator.py --replay export.ndjson --capacity diagnostico=3
+             python Simulation/WorkshopSimulator.py --routing shortest --mix simple=0.5 complex=0.5
+"""
+import argparse
+import heapq
+import json
+import random
+import sys
+import os
+import time
+from datetime import datetime
+from itertools import chain
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Config import WorkshopLayout
+from Routing.RouteTable import build_weighted_graph, route_table
+
+START_LOCATION = 'recepcion'
+END_LOCATION = 'terminado'
+
+# Proporción de tipos de reparación de las llegadas sintéticas
+DEFAULT_MIX = {'simple': 0.5, 'complex': 0.2, 'standard': 0.3}
+
+# 'repair-type': etapas de RepairType; 'shortest': camino mínimo de route_table
+ROUTING_MODES = ('repair-type', 'shortest')
+
+
+class Route:
+    """
+    @brief Ruta de un tipo de reparación preparada para la simulación.
+
+    @details stations[i] es el índice de la i-ésima estación visitada (sin
+             'terminado') y travel[i] los minutos hasta la siguiente.
+    """
+
+    def __init__(self, repair_type, station_index, routing='repair-type'):
+        if routing == 'repair-type':
+            stages = WorkshopLayout.RepairType.get(repair_type, WorkshopLayout.RepairType['standard'])
+        else:
+            stages = [START_LOCATION, END_LOCATION]
+
+        path = [stages[0]]
+        for origin, destination in zip(stages, stages[1:]):
+            route = route_table.lookup(origin, destination, repair_type)
+            if route is None:
+                raise ValueError(f"No hay ruta de '{origin}' a '{destination}' para '{repair_type}'")
+            path.extend(route[0][1:])
+
+        weights = build_weighted_graph(repair_type)
+        self.repair_type = repair_type
+        self.path = path
+        self.stations = [station_index[station] for station in path[:-1]]
+        self.travel = [weights[path[i]][path[i + 1]] for i in range(len(path) - 1)]
+
+
+class SimulationResult:
+    """
+    @brief Métricas de una corrida.
+    """
+
+    def __init__(self, stations, capacity, service_time):
+        self.stations = stations
+        self.capacity = capacity
+        self.service_time = service_time
+        self.tickets = 0
+        self.first_arrival = 0.0
+        self.last_completion = 0.0
+        self.time_in_shop = []
+        self.visits = [0] * len(stations)
+        self.waiting = [0.0] * len(stations)
+        self.max_waiting = [0.0] * len(stations)
+        self.elapsed = 0.0
+
+    def to_dict(self):
+        horizon = self.last_completion - self.first_arrival
+        times = sorted(self.time_in_shop)
+        completed = len(times)
+
+        def percentile(fraction):
+            if not times:
+                return 0
+            return round(times[min(completed - 1, int(fraction * completed))], 2)
+
+        stations = []
+        for i, station in enumerate(self.stations):
+            capacity = self.capacity[i]
+            busy = self.visits[i] * self.service_time[i]
+            stations.append({
+                'station': station,
+                'capacity': capacity,
+                'service_time': self.service_time[i],
+                'visits': self.visits[i],
+                'utilization': round(busy / (capacity * horizon), 4) if capacity and horizon else None,
+                'mean_wait': round(self.waiting[i] / self.visits[i], 2) if self.visits[i] else 0,
+                'max_wait': round(self.max_waiting[i], 2)
+            })
+
+        return {
+            'tickets': self.tickets,
+            'completed': completed,
+            'horizon_minutes': round(horizon, 2),
+            'throughput_per_hour': round(completed * 60 / horizon, 2) if horizon else 0,
+            'time_in_shop': {
+                'mean': round(sum(times) / completed, 2) if completed else 0,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'max': round(times[-1], 2) if times else 0
+            },
+            'stations': stations,
+            'elapsed_seconds': round(self.elapsed, 2)
+        }
+
+
+def synthetic_arrivals(count, arrival_rate, mix=None, seed=None):
+    """
+    @brief Genera llegadas de un proceso de Poisson.
+
+    @param count Cantidad de equipos.
+    @param arrival_rate Equipos por hora.
+    @param mix Diccionario {tipo de reparación: proporción}.
+    @param seed Semilla del generador aleatorio.
+    @return Iterador de tuplas (minuto de llegada, tipo de reparación).
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    types = list(mix)
+    weights = list(mix.values())
+    rate = arrival_rate / 60.0
+    now = 0.0
+    batch = 10000
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        repair_types = rng.choices(types, weights, k=size)
+        for repair_type in repair_types:
+            now += rng.expovariate(rate)
+            yield now, repair_type
+
+
+def replay_arrivals(path):
+    """
+    @brief Lee las llegadas de una exportación NDJSON (GET /tickets/export).
+
+    @details Usa created_at como instante de llegada y repair_type como tipo de
+             reparación ('standard' si falta). Las llegadas se ordenan por
+             fecha y se expresan en minutos desde la primera.
+
+    @return Lista de tuplas (minuto de llegada, tipo de reparación).
+    """
+    arrivals = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            ticket = json.loads(line)
+            created_at = ticket.get('created_at')
+            if not created_at:
+                continue
+            arrivals.append((datetime.fromisoformat(created_at), ticket.get('repair_type') or 'standard'))
+
+    arrivals.sort(key=lambda arrival: arrival[0])
+    if not arrivals:
+        return []
+    origin = arrivals[0][0]
+    return [((created_at - origin).total_seconds() / 60.0, repair_type) for created_at, repair_type in arrivals]
+
+
+def _stations():
+    """
+    @brief Estaciones del layout en el orden de WorkshopGraph.
+    """
+    nodes = list(WorkshopLayout.WorkshopGraph)
+    for edges in WorkshopLayout.WorkshopGraph.values():
+        for node in edges:
+            if node not in nodes:
+                nodes.append(node)
+    return nodes
+
+
+def simulate(arrivals, capacity=None, service_time=None, routing='repair-type'):
+    """
+    @brief Ejecuta la simulación.
+
+    @param arrivals Iterable de (minuto de llegada, tipo de reparación) en orden
+           creciente de tiempo.
+    @param capacity Puestos por estación que reemplazan a StationCapacity (al menos 1).
+    @param service_time Minutos de atención que reemplazan a StationServiceTime.
+    @param routing Uno de ROUTING_MODES.
+    @return SimulationResult.
+    """
+    if routing not in ROUTING_MODES:
+        raise ValueError(f"Ruteo inválido: '{routing}'. Valores permitidos: {list(ROUTING_MODES)}")
+    invalid = [station for station, count in (capacity or {}).items() if count < 1]
+    if invalid:
+        raise ValueError(f"La cantidad de puestos debe ser al menos 1: {invalid}")
+
+    capacities = dict(WorkshopLayout.StationCapacity)
+    capacities.update(capacity or {})
+    service_times = dict(WorkshopLayout.StationServiceTime)
+    service_times.update(service_time or {})
+
+    stations = [station for station in _stations() if station != END_LOCATION]
+    station_index = {station: i for i, station in enumerate(stations)}
+    station_capacity = [capacities.get(station) or 0 for station in stations]
+    station_service = [service_times.get(station, 0) for station in stations]
+    result = SimulationResult(stations, [capacities.get(station) for station in stations], station_service)
+
+    # Instantes en que se libera cada puesto, por estación
+    servers = [[0.0] * count for count in station_capacity]
+
+    routes = {}
+    visits = result.visits
+    waiting = result.waiting
+    max_waiting = result.max_waiting
+    time_in_shop = result.time_in_shop
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    heapreplace = heapq.heapreplace
+
+    # Eventos en curso: (minuto, secuencia, minuto de entrada, ruta, paso)
+    events = []
+    sequence = 0
+    started = time.perf_counter()
+
+    arrivals = iter(arrivals)
+    next_arrival = next(arrivals, None)
+    if next_arrival is not None:
+        result.first_arrival = next_arrival[0]
+
+    while True:
+        if next_arrival is not None and (not events or next_arrival[0] <= events[0][0]):
+            now, repair_type = next_arrival
+            route = routes.get(repair_type)
+            if route is None:
+                route = routes[repair_type] = Route(repair_type, station_index, routing)
+            entered = now
+            step = 0
+            result.tickets += 1
+            next_arrival = next(arrivals, None)
+        elif events:
+            now, _, entered, route, step = heappop(events)
+        else:
+            break
+
+        route_stations = route.stations
+        if step == len(route_stations):
+            time_in_shop.append(now - entered)
+            if now > result.last_completion:
+                result.last_completion = now
+            continue
+
+        station = route_stations[step]
+        visits[station] += 1
+        station_servers = servers[station]
+        if station_servers:
+            free_at = station_servers[0]
+            start = free_at if free_at > now else now
+            finish = start + station_service[station]
+            heapreplace(station_servers, finish)
+            wait = start - now
+            if wait > 0:
+                waiting[station] += wait
+                if wait > max_waiting[station]:
+                    max_waiting[station] = wait
+        else:
+            finish = now + station_service[station]
+
+        sequence += 1
+        heappush(events, (finish + route.travel[step], sequence, entered, route, step + 1))
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _parse_assignments(values, cast):
+    parsed = {}
+    for value in values or []:
+        name, _, amount = value.partition('=')
+        if not name or not amount:
+            raise argparse.ArgumentTypeError(f"Se esperaba estacion=valor: '{value}'")
+        parsed[name] = cast(amount)
+    return parsed
+
+
+def _format_report(report):
+    lines = [
+        f"Equipos: {report['tickets']} (terminados: {report['completed']})",
+        f"Duración simulada: {report['horizon_minutes']} min",
+        f"Rendimiento: {report['throughput_per_hour']} equipos/hora",
+        "Tiempo en el taller (min): media {mean}, p50 {p50}, p95 {p95}, máx {max}".format(**report['time_in_shop']),
+        '',
+        f"{'Estación':<22}{'Puestos':>8}{'Visitas':>10}{'Uso':>8}{'Espera media':>14}{'Espera máx':>12}"
+    ]
+    for station in report['stations']:
+        utilization = f"{station['utilization']:.0%}" if station['utilization'] is not None else '-'
+        capacity = station['capacity'] if station['capacity'] else '-'
+        lines.append(
+            f"{station['station']:<22}{capacity:>8}{station['visits']:>10}{utilization:>8}"
+            f"{station['mean_wait']:>14}{station['max_wait']:>12}"
+        )
+    lines.append('')
+    lines.append(f"Simulado en {report['elapsed_seconds']} s")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulación de eventos discretos del taller')
+    parser.add_argument('--tickets', type=int, default=10000, help='Cantidad de equipos sintéticos')
+    parser.add_argument('--arrival-rate', type=float, default=20.0, help='Llegadas sintéticas por hora')
+    parser.add_argument('--mix', nargs='*', metavar='TIPO=PROPORCION',
+                        help='Proporción de tipos de reparación (ej. simple=0.6 complex=0.4)')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla del generador aleatorio')
+    parser.add_argument('--replay', metavar='ARCHIVO', help='Exportación NDJSON de /tickets/export a reproducir')
+    parser.add_argument('--capacity', nargs='*', metavar='ESTACION=PUESTOS',
+                        help='Reemplaza StationCapacity (ej. diagnostico=3)')
+    parser.add_argument('--service-time', nargs='*', metavar='ESTACION=MINUTOS',
+                        help='Reemplaza StationServiceTime (ej. pruebas=2)')
+    parser.add_argument('--routing', choices=ROUTING_MODES, default='repair-type',
+                        help="Etapas de RepairType (por defecto) o camino mínimo de route_table")
+    parser.add_argument('--json', action='store_true', help='Imprimir el resultado en JSON')
+    args = parser.parse_args(argv)
+
+    try:
+        mix = _parse_assignments(args.mix, float) or None
+        capacity = _parse_assignments(args.capacity, int)
+        service_time = _parse_assignments(args.service_time, float)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+
+    if mix:
+        unknown = [repair_type for repair_type in mix if repair_type not in WorkshopLayout.RepairType]
+        if unknown:
+            parser.error(f"Tipo de reparación inválido: {unknown}. Valores permitidos: {list(WorkshopLayout.RepairType)}")
+        if any(weight < 0 for weight in mix.values()) or sum(mix.values()) <= 0:
+            parser.error('Las proporciones de --mix no pueden ser negativas y deben sumar más de 0')
+
+    stations = _stations()
+    unknown = [station for station in chain(capacity, service_time) if station not in stations]
+    if unknown:
+        parser.error(f"Estación inválida: {unknown}. Valores permitidos: {stations}")
+    invalid = [station for station, count in capacity.items() if count < 1]
+    if invalid:
+        parser.error(f"La cantidad de puestos debe ser al menos 1: {invalid}")
+    invalid = [station for station, minutes in service_time.items() if minutes < 0]
+    if invalid:
+        parser.error(f"El tiempo de atención no puede ser negativo: {invalid}")
+
+    if args.replay:
+        arrivals = replay_arrivals(args.replay)
+    else:
+        if args.tickets < 1 or args.arrival_rate <= 0:
+            parser.error('--tickets y --arrival-rate deben ser positivos')
+        arrivals = synthetic_arrivals(args.tickets, args.arrival_rate, mix, args.seed)
+
+    report = simulate(arrivals, capacity, service_time, args.routing).to_dict()
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(_format_report(report))
+
+
+if __name__ == '__main__':
+    main()
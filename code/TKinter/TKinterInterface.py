@@ -1,16 +1,45 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import json
+import queue
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 
+# Cada cuánto el hilo de la interfaz procesa los eventos recibidos (ms)
+EVENT_POLL_MS = 100
+# Espera antes de reconectar el canal de eventos (segundos)
+EVENT_RETRY_SECONDS = 3
+# Tiempo máximo sin recibir datos del canal (el servidor envía keep-alive cada 15 s)
+EVENT_READ_TIMEOUT = 60
+
 class WorkshopMonitorApp:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Monitor de Flujo del Taller - Sistema de Optimización")
         self.root.geometry("1000x600")
         
+        # Eventos SSE y resultados de peticiones, consumidos por el hilo de Tk
+        self.events = queue.Queue()
+        self.events_connected = False
+        self.stop_event = threading.Event()
+        
+        # Las peticiones corren en un único hilo de fondo que reutiliza la sesión HTTP
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        
+        # Valores mostrados por fila (id del ticket -> tupla de columnas)
+        self.rows = {}
+        self.active_etag = None
+        self.refresh_pending = False
+        self.refresh_again = False
+        
         self.setup_ui()
+        self.root.after(EVENT_POLL_MS, self.process_events)
         self.refresh_data()
+        self.start_event_listener()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
     
     def setup_ui(self):
         # Frame principal
@@ -114,55 +143,212 @@ class WorkshopMonitorApp:
         """Construir URL de la API"""
         return f"http://localhost:5000{endpoint}"
     
+    def run_in_background(self, request_func, on_done):
+        """Ejecutar una petición fuera del hilo de Tk.
+        
+        on_done(resultado, error) se ejecuta luego en el hilo de Tk.
+        """
+        future = self.executor.submit(request_func)
+        future.add_done_callback(lambda f: self.events.put(('callback', (on_done, f))))
+    
     def refresh_data(self):
         """Actualizar datos desde la API"""
-        try:
-            response = requests.get(self.get_api_url("/tickets/active"), timeout=5)
-            if response.status_code == 200:
-                data = response.json()
+        if self.refresh_pending:
+            # Repetir al terminar la petición en curso, que puede ser anterior al cambio
+            self.refresh_again = True
+            return
+        self.refresh_pending = True
+        self.run_in_background(self.fetch_active_tickets, self.on_tickets_loaded)
+    
+    def fetch_active_tickets(self):
+        """Pedir los tickets activos (corre en el hilo de fondo)"""
+        headers = {'If-None-Match': self.active_etag} if self.active_etag else {}
+        response = self.session.get(self.get_api_url("/tickets/active?compact=1"), headers=headers, timeout=5)
+        data = response.json() if response.status_code == 200 else None
+        return response.status_code, response.headers.get('ETag'), data
+    
+    def on_tickets_loaded(self, result, error):
+        """Aplicar la respuesta de /tickets/active"""
+        self.refresh_pending = False
+        
+        if error is not None:
+            self.status_label.config(text="No se puede conectar al servidor")
+            print(f"Error de conexión: {error}")
+        else:
+            status_code, etag, data = result
+            if status_code == 200:
+                self.active_etag = etag
                 self.update_tickets_display(data['active_tickets'])
                 self.status_label.config(text=f"{data['count']} tickets activos")
+            elif status_code == 304:
+                self.status_label.config(text=f"{len(self.rows)} tickets activos")
             else:
                 self.status_label.config(text=" Error al cargar datos")
-                
-        except requests.exceptions.RequestException as e:
-            self.status_label.config(text="No se puede conectar al servidor")
-            print(f"Error de conexión: {e}")
+        
+        if self.refresh_again:
+            self.refresh_again = False
+            self.refresh_data()
+    
+    def ticket_row(self, ticket: Dict[str, Any]):
+        """Valores de las columnas para un ticket"""
+        return (
+            str(ticket['id']),
+            ticket['client_name'],
+            ticket.get('unit_equipment_name') or 'N/A',
+            ticket.get('current_location') or 'N/A',
+            ticket.get('recommended_next_step') or 'N/A',
+            f"{ticket.get('estimated_process_time') or 0} min",
+            ticket.get('state') or 'N/A',
+        )
+    
+    def set_row(self, iid: str, values):
+        """Insertar o actualizar una fila solo si sus valores cambiaron"""
+        previous = self.rows.get(iid)
+        if previous == values:
+            return
+        if previous is None:
+            self.tree.insert('', tk.END, iid=iid, values=values)
+        else:
+            self.tree.item(iid, values=values)
+        self.rows[iid] = values
+    
+    def remove_row(self, iid: str):
+        if self.rows.pop(iid, None) is not None:
+            self.tree.delete(iid)
     
     def update_tickets_display(self, tickets: List[Dict[str, Any]]):
-        """Actualizar el treeview con los tickets"""
-        # Limpiar treeview
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Actualizar el treeview con los tickets.
         
-        # Agregar tickets
+        Compara con las filas existentes (el id del ticket es el id de la fila)
+        y solo toca las que se agregaron, cambiaron o ya no están activas.
+        """
+        incoming = set()
         for ticket in tickets:
+            iid = str(ticket['id'])
+            incoming.add(iid)
+            self.set_row(iid, self.ticket_row(ticket))
+        
+        for iid in [iid for iid in self.rows if iid not in incoming]:
+            self.remove_row(iid)
+    
+    def start_event_listener(self):
+        """Iniciar el hilo que escucha el canal de eventos del servidor"""
+        listener = threading.Thread(target=self.listen_events, daemon=True)
+        listener.start()
+    
+    def listen_events(self):
+        """Leer el stream SSE de /tickets/events (corre fuera del hilo de Tk)"""
+        # Sesión propia: la conexión queda tomada por el stream
+        session = requests.Session()
+        while not self.stop_event.is_set():
+            try:
+                with session.get(self.get_api_url("/tickets/events"), stream=True,
+                                 timeout=(5, EVENT_READ_TIMEOUT)) as response:
+                    response.raise_for_status()
+                    self.events.put(('connected', None))
+                    
+                    event_type, data = 'message', []
+                    for line in response.iter_lines(decode_unicode=True):
+                        if self.stop_event.is_set():
+                            return
+                        if not line:
+                            if data:
+                                self.events.put((event_type, json.loads('\n'.join(data))))
+                            event_type, data = 'message', []
+                        elif line.startswith('event:'):
+                            event_type = line[6:].strip()
+                        elif line.startswith('data:'):
+                            data.append(line[5:].strip())
+                
+                self.events.put(('disconnected', None))
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self.events.put(('disconnected', str(e)))
             
-            self.tree.insert('', tk.END, values=(
-                ticket['id'],
-                ticket['client_name'],
-                ticket.get('unit_equipment_name', 'N/A'),
-                ticket.get('recommended_next_step', 'N/A'),
-                f"{ticket.get('estimated_process_time', 0)} min",
-            ))
+            self.stop_event.wait(EVENT_RETRY_SECONDS)
     
+    def process_events(self):
+        """Aplicar en la interfaz los eventos y resultados recibidos de los hilos de fondo"""
+        try:
+            while True:
+                event_type, data = self.events.get_nowait()
+                
+                if event_type == 'callback':
+                    on_done, future = data
+                    error = future.exception()
+                    on_done(None if error else future.result(), error)
+                elif event_type == 'location':
+                    self.apply_location_event(data)
+                elif event_type == 'deleted':
+                    self.remove_row(str(data['ticket_id']))
+                    self.status_label.config(text=f"{len(self.rows)} tickets activos")
+                elif event_type in ('connected', 'created', 'batch-optimized'):
+                    # Al (re)conectar se recupera lo que pudo perderse mientras tanto; las
+                    # altas y la optimización masiva traen filas nuevas o muchas a la vez
+                    self.events_connected = True
+                    self.refresh_data()
+                elif event_type == 'disconnected':
+                    self.events_connected = False
+                    self.status_label.config(text="Sin conexión al canal de eventos")
+        except queue.Empty:
+            pass
+        
+        if not self.stop_event.is_set():
+            self.root.after(EVENT_POLL_MS, self.process_events)
+    
+    def apply_location_event(self, data: Dict[str, Any]):
+        """Actualizar la fila de un ticket a partir de un evento 'location'"""
+        iid = str(data['ticket_id'])
+        
+        if data['current_location'] == 'terminado':
+            self.remove_row(iid)
+            self.status_label.config(text=f"{len(self.rows)} tickets activos")
+            return
+        
+        values = self.rows.get(iid)
+        if values is None:
+            # Ticket que todavía no está en la tabla
+            self.refresh_data()
+            return
+        
+        values = list(values)
+        values[3] = data['current_location']
+        values[4] = data.get('recommended_next_step') or 'N/A'
+        values[5] = f"{data.get('estimated_process_time') or 0} min"
+        self.set_row(iid, tuple(values))
+    
+    def refresh_if_disconnected(self):
+        """Recargar la lista solo si el canal de eventos no la mantiene al día"""
+        if not self.events_connected:
+            self.refresh_data()
+    
+    def selected_ticket_id(self):
+        """Id del ticket seleccionado, o None (avisando al usuario)"""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Advertencia", "Selecciona un ticket primero")
+            return None
+        return selection[0]
     
     def on_ticket_select(self, event):
         """Manejar selección de ticket"""
         selection = self.tree.selection()
         if selection:
-            item = selection[0]
-            ticket_id = self.tree.item(item, 'values')[0]
-            self.show_ticket_details(ticket_id)
+            self.show_ticket_details(selection[0])
     
     def show_ticket_details(self, ticket_id: str):
         """Mostrar detalles del ticket seleccionado"""
-        try:
-            response = requests.get(self.get_api_url(f"/tickets/{ticket_id}"), timeout=5)
-            if response.status_code == 200:
-                ticket = response.json()
-                
-                details_text = f"""
+        def fetch():
+            response = self.session.get(self.get_api_url(f"/tickets/{ticket_id}"), timeout=5)
+            return response.json() if response.status_code == 200 else None
+        
+        def on_done(ticket, error):
+            if error is not None:
+                print(f"Error al obtener detalles: {error}")
+                return
+            if ticket is None:
+                return
+            
+            details_text = f"""
 Ticket ID: {ticket['id']}
 Título: {ticket['title']}
 Descripción: {ticket.get('description', 'N/A')}
@@ -173,52 +359,61 @@ Siguiente paso recomendado: {ticket.get('recommended_next_step', 'N/A')}
 Tiempo estimado: {ticket.get('estimated_process_time', 0)} minutos
 Estado: {ticket.get('state', 'N/A')}
 Incidentes: {len(ticket.get('incidents', []))}
-                """.strip()
-                
-                self.details_text.config(state=tk.NORMAL)
-                self.details_text.delete(1.0, tk.END)
-                self.details_text.insert(1.0, details_text)
-                self.details_text.config(state=tk.DISABLED)
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Error al obtener detalles: {e}")
+            """.strip()
+            
+            self.details_text.config(state=tk.NORMAL)
+            self.details_text.delete(1.0, tk.END)
+            self.details_text.insert(1.0, details_text)
+            self.details_text.config(state=tk.DISABLED)
+        
+        self.run_in_background(fetch, on_done)
     
     def optimize_all_workflows(self):
         """Optimizar el flujo de todos los tickets activos"""
-        try:
-            response = requests.post(self.get_api_url("/tickets/batch-optimize"), timeout=10)
-            if response.status_code == 200:
-                result = response.json()
+        def request():
+            response = self.session.post(self.get_api_url("/tickets/batch-optimize"), timeout=10)
+            return response.status_code, response.json()
+        
+        def on_done(result, error):
+            if error is not None:
+                self.status_label.config(text="Error de conexión")
+                messagebox.showerror("Error", f"No se pudo conectar al servidor: {error}")
+                return
+            
+            status_code, result = result
+            if status_code == 200:
                 self.status_label.config(text=f" {result['message']}")
-                self.refresh_data()
+                self.refresh_if_disconnected()
                 messagebox.showinfo("Éxito", result['message'])
             else:
                 self.status_label.config(text="Error al optimizar")
                 messagebox.showerror("Error", "No se pudieron optimizar los tickets")
-        except requests.exceptions.RequestException as e:
-            self.status_label.config(text="Error de conexión")
-            messagebox.showerror("Error", f"No se pudo conectar al servidor: {e}")
+        
+        self.status_label.config(text="Optimizando...")
+        self.run_in_background(request, on_done)
     
     def optimize_selected_ticket(self):
         """Optimizar el ticket seleccionado"""
-        selection = self.tree.selection()
-        if not selection:
-            messagebox.showwarning("Advertencia", "Selecciona un ticket primero")
+        ticket_id = self.selected_ticket_id()
+        if ticket_id is None:
             return
         
-        ticket_id = self.tree.item(selection[0], 'values')[0]
+        def request():
+            response = self.session.get(self.get_api_url(f"/tickets/{ticket_id}/optimal-workflow"), timeout=5)
+            return response.status_code, response.json()
         
-        try:
-            response = requests.get(
-                self.get_api_url(f"/tickets/{ticket_id}/optimal-workflow"), 
-                timeout=5
-            )
-            if response.status_code == 200:
-                result = response.json()
+        def on_done(result, error):
+            if error is not None:
+                self.status_label.config(text="Error de conexión")
+                messagebox.showerror("Error", f"No se pudo conectar al servidor: {error}")
+                return
+            
+            status_code, result = result
+            if status_code == 200:
                 self.status_label.config(
                     text=f"Ticket {ticket_id} optimizado. Siguiente: {result['recommended_next_step']}"
                 )
-                self.refresh_data()
+                self.refresh_if_disconnected()
                 messagebox.showinfo("Éxito", 
                     f"Ticket {ticket_id} optimizado\n"
                     f"Siguiente paso: {result['recommended_next_step']}\n"
@@ -227,42 +422,48 @@ Incidentes: {len(ticket.get('incidents', []))}
             else:
                 self.status_label.config(text="Error al optimizar ticket")
                 messagebox.showerror("Error", "No se pudo optimizar el ticket")
-        except requests.exceptions.RequestException as e:
-            self.status_label.config(text="Error de conexión")
-            messagebox.showerror("Error", f"No se pudo conectar al servidor: {e}")
+        
+        self.run_in_background(request, on_done)
     
     def move_selected_ticket(self):
         """Mover el ticket seleccionado al siguiente paso"""
-        selection = self.tree.selection()
-        if not selection:
-            messagebox.showwarning("Advertencia", "Selecciona un ticket primero")
+        ticket_id = self.selected_ticket_id()
+        if ticket_id is None:
             return
         
-        ticket_id = self.tree.item(selection[0], 'values')[0]
+        def request():
+            response = self.session.post(self.get_api_url(f"/tickets/{ticket_id}/move-to-next"), timeout=5)
+            return response.status_code, response.json()
         
-        try:
-            response = requests.post(
-                self.get_api_url(f"/tickets/{ticket_id}/move-to-next"), 
-                timeout=5
-            )
-            if response.status_code == 200:
-                result = response.json()
+        def on_done(result, error):
+            if error is not None:
+                self.status_label.config(text="Error de conexión")
+                messagebox.showerror("Error", f"No se pudo conectar al servidor: {error}")
+                return
+            
+            status_code, result = result
+            if status_code == 200:
                 self.status_label.config(
                     text=f"Ticket {ticket_id} movido a: {result['new_location']}"
                 )
-                self.refresh_data()
+                self.refresh_if_disconnected()
                 messagebox.showinfo("Éxito", 
                     f"Ticket {ticket_id} movido\n"
                     f"De: {result['previous_location']}\n"
                     f"A: {result['new_location']}"
                 )
             else:
-                error_msg = response.json().get('error', 'Error desconocido')
+                error_msg = result.get('error', 'Error desconocido')
                 self.status_label.config(text=f"{error_msg}")
                 messagebox.showerror("Error", error_msg)
-        except requests.exceptions.RequestException as e:
-            self.status_label.config(text="Error de conexión")
-            messagebox.showerror("Error", f"No se pudo conectar al servidor: {e}")
+        
+        self.run_in_background(request, on_done)
+    
+    def close(self):
+        """Detener los hilos de fondo y cerrar la ventana"""
+        self.stop_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
     
     def run(self):
         """Ejecutar la aplicación"""
@@ -270,4 +471,4 @@ Incidentes: {len(ticket.get('incidents', []))}
 
 if __name__ == "__main__":
     app = WorkshopMonitorApp()
-    app.run()
\ No newline at end of file
+    app.run()
@@ -2,6 +2,8 @@ from flask import Flask
 from flasgger import Swagger
 from flask import render_template
 from Database.database import init_db
+from Database.ChangeTracking import init_change_tracking
+from Routing.StationLoad import init_station_load
 from Controllers.TicketController import tickets_bp
 from Controllers.IncidentController import incidents_bp
 
@@ -42,6 +44,8 @@ SWAGGER_TEMPLATE = {
 
 # Inicializar base de datos
 init_db(app)
+init_change_tracking(app)
+init_station_load(app)
 
 # Registrar blueprints ANTES de inicializar Swagger para que pueda descubrir los endpoints
 app.register_blueprint(tickets_bp)
@@ -137,6 +137,48 @@ def test_error_cases(ticket_id):
     r = requests.post(f"{API}/incidents", json={"description":"x","ticket_id":9999999}, timeout=TMO)
     expect_fail(r, (404,400))
 
+def test_pagination():
+    # recorrer /tickets por páginas usando el cursor
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "fields": "id,client_name,current_location"}
+        if cursor:
+            params["cursor"] = cursor
+        r = requests.get(f"{API}/tickets", params=params, timeout=TMO)
+        if not ok(r, 200): return False
+        page = r.json()
+        if any(set(t.keys()) != {"id", "client_name", "current_location"} for t in page):
+            print("La proyección devolvió campos no pedidos"); return False
+        seen.extend(t["id"] for t in page)
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    if seen != sorted(set(seen)):
+        print("Páginas con ids repetidos o desordenados"); return False
+
+    # cursor inválido
+    r = requests.get(f"{API}/tickets", params={"cursor": "no-es-un-cursor"}, timeout=TMO)
+    return expect_fail(r, (400,))
+
+def test_conditional_get(ticket_id):
+    # el ETag devuelto permite pedir el ticket y la lista activa de forma condicional
+    for url in (f"{API}/tickets/{ticket_id}", f"{API}/tickets/active"):
+        r = requests.get(url, timeout=TMO)
+        if not ok(r, 200): return False
+        etag = r.headers.get("ETag")
+        if not etag:
+            print(f"{url} no devolvió ETag"); return False
+        r = requests.get(url, headers={"If-None-Match": etag}, timeout=TMO)
+        if not ok(r, 304): return False
+
+    # una escritura cambia el ETag del ticket
+    etag = requests.get(f"{API}/tickets/{ticket_id}", timeout=TMO).headers.get("ETag")
+    requests.put(f"{API}/tickets/{ticket_id}", json={"description": "Cambio para ETag"}, timeout=TMO)
+    r = requests.get(f"{API}/tickets/{ticket_id}", headers={"If-None-Match": etag}, timeout=TMO)
+    return ok(r, 200)
+
 def main():
     ok_all = True
     print("Comprobando servicios básicos...")
@@ -147,6 +189,12 @@ def main():
     if not ticket_id:
         print("Fallo en CRUD de tickets"); sys.exit(1)
 
+    print("\nProbando paginación por cursor...")
+    ok_all &= test_pagination()
+
+    print("\nProbando peticiones condicionales (ETag)...")
+    ok_all &= test_conditional_get(ticket_id)
+
     time.sleep(0.2)
     print("\nRealizando CRUD incidents asociados al ticket creado...")
     ok_all &= test_incidents_crud(ticket_id)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Pruebas de TicketRepository contra la base por defecto (code/Ticketing.db).
+
+Se trabaja sobre una copia del archivo para no modificar la base del repositorio.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "code"))
+
+from Repositories.TicketRepository import DB_PATH, ConnectionPool, TicketRepository
+from Migration.AlignTicketRepository import align_ticket_repository
+
+
+def _copy_default_db(directory):
+    path = os.path.join(directory, "Ticketing.db")
+    shutil.copyfile(DB_PATH, path)
+    return path
+
+
+def test_crud_on_default_db():
+    with tempfile.TemporaryDirectory() as directory:
+        repo = TicketRepository(_copy_default_db(directory))
+        try:
+            ticket_id = repo.create(client="Cliente", incident="No enciende", message="Hola")
+            ticket = repo.get_by_id(ticket_id)
+            assert ticket["client"] == "Cliente"
+            assert ticket["messages"] == "Hola"
+            assert ticket["state"] == "open"
+
+            assert repo.update(ticket_id, state="in_progress", unit_equipment="Notebook")
+            assert repo.get_by_id(ticket_id)["unit_equipment"] == "Notebook"
+
+            assert repo.create_many([{"client": f"C{i}", "service_records": "ok"} for i in range(3)]) == 3
+            assert len(repo.get_all()) >= 4
+            assert sum(1 for _ in repo.iter_all(batch_size=2)) == len(repo.get_all())
+            assert [row["id"] for row in repo.get_many([ticket_id, -1])] == [ticket_id]
+
+            assert repo.delete(ticket_id)
+            assert repo.get_by_id(ticket_id) is None
+        finally:
+            repo.close()
+
+
+def test_update_while_iterating():
+    with tempfile.TemporaryDirectory() as directory:
+        repo = TicketRepository(_copy_default_db(directory))
+        try:
+            repo.create_many([{"client": f"C{i}"} for i in range(12)])
+            # Cada update usa otra conexión del pool mientras iter_all mantiene la lectura abierta
+            updated = sum(repo.update(row["id"], state="closed") for row in repo.iter_all(batch_size=5))
+            assert updated == len(repo.get_all())
+            assert {ticket["state"] for ticket in repo.get_all()} == {"closed"}
+        finally:
+            repo.close()
+
+
+def test_unit_of_work_commits_or_rolls_back():
+    with tempfile.TemporaryDirectory() as directory:
+        repo = TicketRepository(_copy_default_db(directory))
+        try:
+            with repo.unit_of_work():
+                ticket_id = repo.create(client="Cliente")
+                with repo.unit_of_work():
+                    repo.update(ticket_id, state="in_progress")
+            assert repo.get_by_id(ticket_id)["state"] == "in_progress"
+
+            try:
+                with repo.unit_of_work():
+                    repo.update(ticket_id, state="closed")
+                    discarded = repo.create(client="Descartado")
+                    raise RuntimeError("falla")
+            except RuntimeError:
+                pass
+            assert repo.get_by_id(ticket_id)["state"] == "in_progress"
+            assert repo.get_by_id(discarded) is None
+        finally:
+            repo.close()
+
+
+def test_pool_is_bounded():
+    with tempfile.TemporaryDirectory() as directory:
+        pool = ConnectionPool(_copy_default_db(directory), max_size=1, timeout=0.1)
+        conn = pool.acquire()
+        try:
+            pool.acquire()
+            assert False, "el pool entregó más conexiones que max_size"
+        except TimeoutError:
+            pass
+        pool.release(conn)
+        assert pool.acquire() is conn
+        pool.release(conn)
+        pool.close()
+
+
+def test_legacy_schema_is_migrated():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, client TEXT, incident TEXT, "
+            "telephone_operator TEXT, service_record TEXT, message TEXT, state TEXT, created_at TEXT, updated_at TEXT)"
+        )
+        conn.execute("INSERT INTO tickets (client, message) VALUES ('Viejo', 'Mensaje')")
+        conn.commit()
+        conn.close()
+
+        align_ticket_repository(path)
+        repo = TicketRepository(path)
+        try:
+            tickets = repo.get_all()
+            assert tickets[0]["client"] == "Viejo"
+            assert tickets[0]["messages"] == "Mensaje"
+            assert repo.update(tickets[0]["id"], message="Nuevo")
+            assert repo.get_by_id(tickets[0]["id"])["messages"] == "Nuevo"
+        finally:
+            repo.close()
+
+
+if __name__ == "__main__":
+    test_crud_on_default_db()
+    test_update_while_iterating()
+    test_unit_of_work_commits_or_rolls_back()
+    test_pool_is_bounded()
+    test_legacy_schema_is_migrated()
+    print("Pruebas de TicketRepository completadas")